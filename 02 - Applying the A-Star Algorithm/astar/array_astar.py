@@ -0,0 +1,150 @@
+import heapq
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.path_finder import PathFinder
+
+UNSEEN, OPEN, CLOSED = 0, 1, 2
+UNREACHED = np.iinfo(np.int64).max
+
+
+class ArrayAstar(PathFinder):
+    """
+    A* working directly on the integer map instead of creating `Node` and `State` objects.
+
+    Every cell is identified by its index `x * width + y` in the flattened map, and the
+    neighbours of a cell are read from the maps adjacency index. The g-values, parents and
+    open/closed status of the cells are kept in flat numpy arrays, so an expansion only
+    allocates the tuple pushed to the heap.
+
+    Ties between nodes with the same f-value are broken in the same way as `Astar`,
+    which means both engines find the exact same path.
+    """
+
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None, lower_bounds=None):
+        """
+        :param lower_bounds: used for the heuristic instead of the Manhattan distance, an object
+            with a `field(goal_pos)` method like `Landmarks`. With diagonal moves the octile
+            distance is used when not given.
+        """
+        super().__init__(map)
+        self.lower_bounds = lower_bounds
+        self.adjacency = map.get_adjacency()
+        self.width = self.adjacency.width
+
+        size = self.adjacency.size
+        self.g = np.full(size, UNREACHED, dtype=np.int64)  # cost from start to each cell
+        self.parent = np.full(size, -1, dtype=np.int64)  # index of the best parent
+        self.status = np.full(size, UNSEEN, dtype=np.uint8)  # UNSEEN, OPEN or CLOSED
+        # insertion number of the latest heap entry of every cell, older entries are outdated
+        self.latest = np.zeros(size, dtype=np.int64)
+        self.seen = []  # cells the latest search wrote to, the only ones reset needs to clear
+        self.reset(start_pos, goal_pos)
+
+    def reset(self, start_pos=None, goal_pos=None):
+        """
+        Clear the arrays so they can be reused for a new search, without allocating them again.
+        Only the cells seen by the previous search are cleared, so a short search stays cheap on a large map.
+        """
+        super().reset(start_pos, goal_pos)
+        if self.seen:
+            seen = np.array(self.seen, dtype=np.int64)
+            self.g[seen] = UNREACHED
+            self.parent[seen] = -1
+            self.status[seen] = UNSEEN
+            self.latest[seen] = 0
+            self.seen = []
+
+        self.start = self.adjacency.to_index(self.start_pos)
+        self.goal = self.adjacency.to_index(self.goal_pos)
+        self.h = None
+        if self.lower_bounds is not None:
+            self.h = self.lower_bounds.field(self.goal_pos)
+        elif self.adjacency.connectivity != 4:
+            self.h = self.adjacency.heuristic_field(self.goal_pos)
+        self.expanded = 0
+        self.goal_found = False
+
+    def agenda_loop(self):
+        """
+        Same loop as `Astar.agenda_loop`, but nodes are only indices into the arrays.
+        Instead of moving a node inside the heap when its f-value changes, a new entry
+        is pushed and the outdated one is skipped when it is popped.
+        """
+        # memoryviews give fast access to the array elements as plain python ints
+        indptr = self.adjacency.indptr_view
+        neighbours = self.adjacency.neighbours_view
+        costs = self.adjacency.costs_view
+        g = memoryview(self.g)
+        parent = memoryview(self.parent)
+        status = memoryview(self.status)
+        latest = memoryview(self.latest)
+        width = self.width
+        goal = self.goal
+        goal_x, goal_y = divmod(goal, width)
+        h = memoryview(self.h) if self.h is not None else None
+        heappush, heappop = heapq.heappush, heapq.heappop
+        seen = self.seen.append
+
+        start_x, start_y = divmod(self.start, width)
+        seen(self.start)
+        g[self.start] = 0
+        status[self.start] = OPEN
+        start_h = h[self.start] if h is not None else abs(goal_x - start_x) + abs(goal_y - start_y)
+        heap = [(start_h, 0, self.start)]
+        insertions = 1
+
+        while heap:
+            _, insertion, current = heappop(heap)
+            if insertion != latest[current]:
+                continue  # outdated entry
+            status[current] = CLOSED
+            self.expanded += 1
+
+            if current == goal:
+                self.goal_found = True
+                return
+
+            current_g = g[current]
+            for i in range(indptr[current], indptr[current + 1]):
+                child = neighbours[i]
+                if status[child] == CLOSED:
+                    continue
+
+                new_path_length = current_g + costs[i]
+                if status[child] == UNSEEN:
+                    seen(child)
+                    status[child] = OPEN
+                    g[child] = new_path_length
+                    parent[child] = current
+                elif new_path_length < g[child]:
+                    g[child] = new_path_length
+                    parent[child] = current
+
+                if h is not None:
+                    f = g[child] + h[child]
+                else:
+                    x, y = divmod(child, width)
+                    f = g[child] + abs(goal_x - x) + abs(goal_y - y)
+                latest[child] = insertions
+                heappush(heap, (f, insertions, child))
+                insertions += 1
+
+    def get_path(self) -> 'list[tuple[int, int]]':
+        if not self.goal_found:
+            return []
+        path = []
+        index = self.goal
+        while index != -1:
+            path.append(self.adjacency.to_pos(index))
+            index = int(self.parent[index])
+        return path[::-1]
+
+    def get_cost(self) -> int:
+        if not self.goal_found:
+            return None
+        return self.adjacency.to_cost(int(self.g[self.goal]))
+
+    def get_expanded(self) -> int:
+        return self.expanded
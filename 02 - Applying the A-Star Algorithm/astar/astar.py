@@ -1,90 +1,153 @@
+import itertools
+import time
+from typing import Iterator
+
+import numpy as np
+
 from environment.Samfundet import Samfundet
+from environment.frames import FrameEncoder
+from astar.path_finder import PathFinder
+from astar.priority_queue import PriorityQueue
+from astar.profiler import SearchProfiler
 from astar.state import State
 from astar.node import Node
 
 
-class Astar:
+class Astar(PathFinder):
 
-    def __init__(self, map: Samfundet):
-        self.map = map
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None, lower_bounds=None, weight=1,
+                 goals=None, profiler: SearchProfiler = None):
+        """
+        :param lower_bounds: used for the heuristic instead of the Manhattan distance, an object
+            with a `field(goal_pos)` method like `Landmarks`. With diagonal moves the octile
+            distance is used when not given.
+        :param weight: nodes are ordered by g + weight * h, with a weight above 1 fewer nodes are
+            expanded but the path can cost up to `weight` times as much as the shortest path
+        :param goals: search for the path to the nearest of these positions instead of to goal_pos
+        :param profiler: counts and times the operations of every search, see `SearchProfiler`
+        """
+        super().__init__(map)
+        self.profiler = profiler
+        self.adjacency = map.get_adjacency()
+        self.lower_bounds = lower_bounds
+        self.weight = weight
+        self.reset(start_pos, goal_pos, goals)
 
-        self.open: list[Node] = []  # sorted by nodes f-values (cheapest first)
-        self.closed: list[Node] = []  # unsorted, contains all visited nodes
+    def reset(self, start_pos=None, goal_pos=None, goals=None):
+        """
+        Start a new search, the nodes from any earlier search are discarded.
+        :param goals: search for the path to the nearest of these positions instead of to goal_pos.
+            The heuristic is the lowest estimate over all the goals, and the search stops at the
+            first goal it expands, which is the nearest one.
+        """
+        super().reset(start_pos, goal_pos)
 
-        # Define the goal state
-        goal_x, goal_y = map.get_goal_pos()
+        # heap ordered by the nodes f-values (cheapest first), ties are broken by
+        # insertion order, same as when this was a sorted list
+        self.open = PriorityQueue()
+        self.insertions = itertools.count()
+        # all visited nodes in the order they were visited
+        self.closed: dict[State, Node] = {}
+        # every node created during this search, so each state only has one node
+        self.nodes: dict[State, Node] = {}
+
+        # Define the goal state, and every goal state when searching for the nearest of several goals
+        goal_x, goal_y = self.goal_pos
         self.goal_state = State(goal_x, goal_y)
+        self.goals = [(x, y) for x, y in goals] if goals is not None else [(goal_x, goal_y)]
+        self.goal_states = {State(x, y) for x, y in self.goals}
+        self.h = None
+        fields = None
+        if self.lower_bounds is not None:
+            fields = [self.lower_bounds.field(goal) for goal in self.goals]
+        elif self.adjacency.connectivity != 4:
+            fields = [self.adjacency.heuristic_field(goal) for goal in self.goals]
+        if fields is not None:
+            # a single field is used as it is, so fields cached by `HeuristicCache` are not copied
+            field = fields[0] if len(fields) == 1 else np.minimum.reduce(fields)
+            # memoryviews give fast access to the array elements as plain python ints
+            self.h = memoryview(np.ascontiguousarray(field))
 
         # initialize start node
-        start_x, start_y = map.get_start_pos()
-        start_node = Node(State(start_x, start_y))
+        start_x, start_y = self.start_pos
+        start_node = self.get_node(start_x, start_y)
         start_node.h = self.heuristic(start_node)
-        self.open.append(start_node)
+        self.start_node = start_node
+        self.add_to_open(start_node)
 
         # save solution node when we find it
         self.goal_node = None
 
-    def find_path(self):
-        """
-        Find the shortest path from the maps given start_pos to its goal_pos, then 
-        shows and saves an image displaying the shortest path.
-        """
-        # Perform the agenda loop
-        self.agenda_loop()
-        print(f'Found path after checking {len(self.closed)} nodes')
-
     def agenda_loop(self):
         """
         The main loop that traverses the map and finds the shortest path.
         returns the goal node, to create the path we simply follow each nodes 
         parent until we reach the start node.
         """
-        while self.has_open_nodes:
+        # Only checked against None when not profiling, so it costs next to nothing
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin()
+
+        while self.has_open_nodes():
 
             # When retreiving a node from the queue, that means
             # we have found the shortst path to this node
-            current_node = self.open.pop(0)
-            self.closed.append(current_node)
+            current_node = self.open.pop()
+            self.closed[current_node.state] = current_node
+            if profiler is not None:
+                profiler.mark('pop', current_node)
 
             if self.is_goal(current_node):
                 # found shortest path to goal
                 self.goal_node = current_node
-                return
+                break
 
             # Find all connected nodes to this node
             children = self.get_children(current_node)
+            if profiler is not None:
+                profiler.mark('neighbours', current_node, len(children))
 
-            for child in children:
-                if child in self.closed:
+            for child, map_value in children:
+                if child.state in self.closed:
                     # Have already found shortest path to the child
                     continue
 
-                map_value = self.map.get_cell_value(
-                    (child.state.x, child.state.y))
-
-                if child not in self.open:
+                if child.state not in self.open:
                     # Node has never been seen before
                     child.h = self.heuristic(child)
+                    if profiler is not None:
+                        profiler.mark('heuristic', child)
                     child.g = current_node.g + map_value
                     child.parent = current_node
+                    event = 'push'
                 else:
-                    # Node has been seen before, get stored values
-                    child = self.open.pop(self.open.index(child))
+                    # Node has been seen before, it already has its stored values
                     old_path_length = child.g
                     new_path_length = current_node.g + map_value
+                    event = 'requeue'
                     if new_path_length < old_path_length:
                         # found shorter path, replace old one and parent
                         child.g = new_path_length
                         child.parent = current_node
+                        event = 'decrease_key'
 
-                self.add_and_sort(child)
+                self.add_to_open(child)
+                if profiler is not None:
+                    profiler.mark(event, child)
 
-        print("Could not find any path from start to end")
+        if profiler is not None:
+            profiler.end()
 
     def heuristic(self, node: Node) -> int:
         """
         Estimate the distance from the `node` to the goal_state.
         """
+        if self.h is not None:
+            return self.h[self.adjacency.to_index((node.state.x, node.state.y))]
+        if len(self.goals) > 1:
+            x, y = node.state.x, node.state.y
+            return min(abs(goal_x - x) + abs(goal_y - y) for goal_x, goal_y in self.goals)
         x_distance = abs(self.goal_state.x - node.state.x)
         y_distance = abs(self.goal_state.y - node.state.y)
         return x_distance + + y_distance
@@ -93,61 +156,229 @@ class Astar:
         """
         Check if there still are som nodes in the queue for us to check
         """
-        return self.open
+        return len(self.open) > 0
 
-    def get_children(self, node) -> 'list[Node]':
+    def get_children(self, node) -> 'list[tuple[Node, int]]':
         """
-        Find all valid Nodes connected to the given node and return them in a list.
+        Find all valid Nodes connected to the given node and return them in a list,
+        together with the cost of moving to them. Uses the maps adjacency index, so
+        walls are already filtered out.
         """
-        children: list[Node] = []
-        for direction in [(0, 1), (0, -1), (-1, 0), (1, 0)]:
-            x = node.state.x + direction[0]
-            y = node.state.y + direction[1]
-            map_value = self.map.get_cell_value((x, y))
-            if map_value != -1:
-                child = Node(State(x, y))
-                children.append(child)
+        children: list[tuple[Node, int]] = []
+        index = self.adjacency.to_index((node.state.x, node.state.y))
+        for neighbour, cost in self.adjacency.get_neighbours(index):
+            x, y = self.adjacency.to_pos(neighbour)
+            children.append((self.get_node(x, y), cost))
         return children
 
+    def get_node(self, x: int, y: int) -> Node:
+        """
+        Get the node for the given coordinate, creating it the first time it is needed.
+        """
+        state = State(x, y)
+        node = self.nodes.get(state)
+        if node is None:
+            node = Node(state)
+            self.nodes[state] = node
+        return node
+
     def is_goal(self, node: Node) -> bool:
-        return node.state == self.goal_state
+        return node.state in self.goal_states
 
-    def add_and_sort(self, node: Node):
+    def get_reached_goal(self) -> 'tuple[int, int]':
         """
-        Add the node to `self.open` in its sorted position (based on its f value)
+        Get the goal the path leads to, the nearest one when searching for several goals.
         """
-        for index, opened in enumerate(self.open):
-            if node.f() < opened.f():
-                self.open.insert(index, node)
-                return
-        self.open.append(node)
+        if self.goal_node is None:
+            return None
+        return self.goal_node.state.x, self.goal_node.state.y
 
-    def set_path_map_values(self, value: str):
+    def add_to_open(self, node: Node):
         """
-        Overwrite the map string values (used to draw the map) to empty 
-        space in order to be able to draw the map with the path easily.
+        Add the node to `self.open` based on its f value, if the node is already in
+        the queue it is moved to its new position instead. Nodes with the same f value
+        are popped in the order they were last added.
         """
-        node = self.goal_node.parent  # skip goal position
-        while node.parent is not None:  # stop before start position
-            self.map.set_cell_value((node.state.x, node.state.y), value)
-            node = node.parent
+        key = node.state
+        priority = (self.get_priority(node), next(self.insertions))
+        if key in self.open:
+            self.open.update(key, priority)
+        else:
+            self.open.push(key, node, priority)
+
+    def get_priority(self, node: Node):
+        """
+        The value nodes are ordered by in the open list, the f value unless the heuristic is weighted.
+        """
+        if self.weight == 1:
+            return node.f
+        return node.g + self.weight * node.h
+
+    def anytime(self, weight=3.0, decrease=0.5, time_budget: float = None) -> 'Iterator[tuple[list, int, float]]':
+        """
+        Anytime Repairing A* (ARA*): find a path quickly with a heavily weighted heuristic, then keep
+        lowering the weight and improving the path while there is time left.
+
+        Every search continues from the previous one instead of starting over. Nodes whose g value
+        improves after they were expanded are kept aside, and only put back in the open list for
+        the next search, so no node is expanded more than once per search. With several goals,
+        the path leads to the goal that is cheapest to reach so far.
+        :param weight: weight of the heuristic in the first search
+        :param decrease: how much the weight is lowered after every search, down to 1
+        :param time_budget: seconds to keep improving the path, by default until it is optimal.
+            The first path is always found, even if that takes longer.
+        :return: a generator yielding the path, its cost and the current bound on how many times more
+            expensive it can be than the shortest path, for the first path and whenever a search
+            improves the path or the bound. Stops when the bound reaches 1, or the time is up.
+        """
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        original_weight, goals = self.weight, self.goals
+        self.weight = weight
+        self.reset(self.start_pos, self.goal_pos, goals)
+        goal_nodes = [self.get_node(x, y) for x, y in self.goals]
+        inconsistent: dict[State, Node] = {}
+        expanded: set[State] = set()
+        best = None
+
+        try:
+            while True:
+                if self.profiler is not None:
+                    self.profiler.begin()
+                improved = self.improve_path(goal_nodes, expanded, inconsistent,
+                                             deadline if self.goal_node is not None else None)
+                if self.profiler is not None:
+                    self.profiler.end()
+                if not improved:
+                    return  # out of time
+                goal_node = self.nearest_goal(goal_nodes)
+                if goal_node is None:
+                    return  # no path
+
+                self.goal_node = goal_node
+                path = self.get_path()
+                # Nodes set aside might already have a cheaper parent than their g value says,
+                # so the path can cost less than the g value of the goal
+                cost = self.adjacency.path_cost(path)
+                # Every cheaper path to the goal passes through an open node or one set aside
+                candidates = [entry[2].f for entry in self.open.heap] + [node.f for node in inconsistent.values()]
+                lowest = min(candidates, default=cost)
+                bound = max(1, min(self.weight, cost / lowest if lowest > 0 else 1))
+                if best is None or (cost, bound) < best:
+                    best = cost, bound
+                    yield path, self.adjacency.to_cost(cost), bound
+                if bound == 1 or (deadline is not None and time.perf_counter() > deadline):
+                    return
+
+                # Next search, with a lower weight: reorder every open node and the ones set aside
+                self.weight = max(1, self.weight - decrease)
+                nodes = [entry[2] for entry in self.open.heap] + list(inconsistent.values())
+                self.open = PriorityQueue()
+                for node in nodes:
+                    self.add_to_open(node)
+                inconsistent.clear()
+                expanded.clear()
+        finally:
+            self.weight, self.goals = original_weight, goals
+
+    def is_seen(self, node: Node) -> bool:
+        """
+        Check if the node has been reached, only the start node has no parent once reached.
+        """
+        return node.parent is not None or node is self.start_node
+
+    def nearest_goal(self, goal_nodes: 'list[Node]') -> Node:
+        """
+        The reached goal with the cheapest path so far, or None if no goal has been reached.
+        """
+        if len(goal_nodes) == 1:
+            # checked before every expansion, so the usual single goal is kept cheap
+            return goal_nodes[0] if self.is_seen(goal_nodes[0]) else None
+        reached = [node for node in goal_nodes if self.is_seen(node)]
+        return min(reached, key=lambda node: node.g, default=None)
+
+    def improve_path(self, goal_nodes: 'list[Node]', expanded: 'set[State]', inconsistent: 'dict[State, Node]',
+                     deadline: float = None) -> bool:
+        """
+        One search of `anytime`, expands nodes until none in the open list could improve the path
+        to the nearest goal by the current weight.
+        :return: False if the deadline was reached first
+        """
+        profiler = self.profiler
+        while self.has_open_nodes():
+            goal_node = self.nearest_goal(goal_nodes)
+            if goal_node is not None and self.get_priority(goal_node) <= self.open.heap[0][0][0]:
+                return True
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+
+            current_node = self.open.pop()
+            expanded.add(current_node.state)
+            self.closed[current_node.state] = current_node
+            if profiler is not None:
+                profiler.mark('pop', current_node)
 
-    def visualize_path(self, show=True, save=True, filename: str = 'solved.png'):
+            children = self.get_children(current_node)
+            if profiler is not None:
+                profiler.mark('neighbours', current_node, len(children))
+            for child, map_value in children:
+                new_path_length = current_node.g + map_value
+                if self.is_seen(child) and new_path_length >= child.g:
+                    continue
+                event = 'decrease_key' if child.state in self.open else 'push'
+                if not self.is_seen(child):
+                    child.h = self.heuristic(child)
+                    if profiler is not None:
+                        profiler.mark('heuristic', child)
+                child.g = new_path_length
+                child.parent = current_node
+                if child.state in expanded:
+                    # improved after it was expanded in this search, wait for the next one
+                    inconsistent[child.state] = child
+                    event = 'reopen'
+                else:
+                    self.add_to_open(child)
+                if profiler is not None:
+                    profiler.mark(event, child)
+        return True
+
+    def get_path(self) -> 'list[tuple[int, int]]':
         """
-        Saves the path to the map object and shows it in an image and/or saves it 
-        with the given filename
+        Follow the parents from the goal node back to the start node.
         """
-        self.set_path_map_values(" ")
-        if(show):
-            self.map.show_map()
-        if(save):
-            self.map.save_map(filename)
-        self.set_path_map_values(' . ')
+        path = []
+        node = self.goal_node
+        while node is not None:
+            path.append((node.state.x, node.state.y))
+            node = node.parent
+        return path[::-1]
+
+    def get_cost(self) -> int:
+        if self.goal_node is None:
+            return None
+        return self.adjacency.to_cost(self.goal_node.g)
+
+    def get_expanded(self) -> int:
+        return len(self.closed)
 
-    def visualize_all_steps(self, path: str):
+    def visualize_all_steps(self, filename: str = 'visited.gif', skip=1, writer=None, max_bytes=256 * 2 ** 20):
         """
-        Show all nodes (tiles) the algorithm checked in an image.
+        Save an animation showing all nodes (tiles) the algorithm checked, one node per frame.
+        The format is given by the filename (.gif or .png for an animated PNG). If the filename
+        contains a `{}` field, every frame is saved as its own image instead, numbered from 0.
+        :param skip: only every `skip`th checked node becomes a frame
+        :param writer: an ImageWriter, used to encode and write the images in the background
+        :param max_bytes: an animation keeps a copy of every frame in memory until it is written,
+            so `skip` is raised until the frames fit in this many bytes (PIL needs over twice as much
+            while encoding them). None for no limit. Not used for numbered images, which are
+            written one at a time.
         """
-        for i, node in enumerate(self.closed[1:-1]):
-            self.map.set_cell_value((node.state.x, node.state.y), " ")
-            self.map.save_map(f'{path}{i:03d}.png')
+        visited = list(self.closed.values())
+        steps = ([((node.state.x, node.state.y), ' ')] for node in visited[1:-1])
+        encoder = FrameEncoder(self.map, skip=skip)
+        if '{' not in filename and max_bytes is not None:
+            max_frames = max(1, max_bytes // encoder.frame.nbytes)
+            encoder.skip = max(skip, -(-(len(visited) - 2) // max_frames))
+        if '{' in filename:
+            encoder.save_frames(filename, steps, writer)
+        else:
+            encoder.save(filename, steps, writer=writer)
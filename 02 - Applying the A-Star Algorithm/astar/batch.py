@@ -0,0 +1,42 @@
+from typing import Iterable, Iterator
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import ArrayAstar
+from astar.path_finder import PathFinder
+
+
+class PathService:
+    """
+    Answers many (start, goal) queries on a single loaded map.
+
+    The map is only read and parsed once, and every query is answered by the same engine
+    instance, so the adjacency index and the engines own arrays are shared by all queries.
+    Heuristic tables are shared by giving the engine the same `lower_bounds`, like a
+    `HeuristicCache` or `Landmarks`.
+    """
+
+    def __init__(self, map: Samfundet, engine: 'type[PathFinder]' = ArrayAstar, **options):
+        """
+        :param options: passed on to the engine, like `lower_bounds` for `Astar` and `ArrayAstar`
+        """
+        self.map = map
+        self.engine = engine(map, **options)
+        self.queries_answered = 0
+
+    def query(self, start_pos, goal_pos) -> 'tuple[list[tuple[int, int]], int]':
+        """
+        Find the shortest path between two positions on the map.
+        :return: the path (empty if there is none) and its cost (None if there is no path)
+        """
+        self.engine.reset(start_pos, goal_pos)
+        self.engine.agenda_loop()
+        self.queries_answered += 1
+        return self.engine.get_path(), self.engine.get_cost()
+
+    def queries(self, pairs: 'Iterable[tuple]') -> 'Iterator[tuple[list[tuple[int, int]], int]]':
+        """
+        Answer a stream of (start_pos, goal_pos) queries, yielding the path and cost of each
+        query in the same order as they were given. The pairs are consumed lazily.
+        """
+        for start_pos, goal_pos in pairs:
+            yield self.query(start_pos, goal_pos)
@@ -0,0 +1,179 @@
+import heapq
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import UNREACHED
+from astar.path_finder import PathFinder
+
+FORWARD, BACKWARD = 0, 1
+
+
+class BidirectionalAstar(PathFinder):
+    """
+    A* searching from the start towards the goal and from the goal towards the start at the
+    same time, stored in flat arrays the same way as `ArrayAstar`.
+
+    Moving into a cell costs the value of that cell, so the backward search pays the value of
+    the cell it moves away from (the adjacency index's `reverse_costs`).
+
+    Both directions use the average of the two Manhattan distances (octile distances with
+    diagonal moves) as heuristic
+    (h = (distance to target - distance to origin) / 2, doubled to stay in integers), which
+    keeps both searches consistent and lets them use the same tight stopping criterion as
+    bidirectional Dijkstra: `best` is the cost of the cheapest complete path seen so far (a
+    node reached from both sides), and once the lowest keys of both open lists add up to
+    at least `best`, no cheaper path can exist.
+    """
+
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None):
+        super().__init__(map)
+        self.adjacency = map.get_adjacency()
+
+        size = self.adjacency.size
+        # One array per direction, indexed with FORWARD / BACKWARD
+        self.g = [np.full(size, UNREACHED, dtype=np.int64) for _ in range(2)]
+        self.parent = [np.full(size, -1, dtype=np.int64) for _ in range(2)]
+        self.closed = [np.zeros(size, dtype=np.bool_) for _ in range(2)]
+        self.latest = [np.zeros(size, dtype=np.int64) for _ in range(2)]
+        self.seen = []  # cells the latest search wrote to in either direction, cleared by reset
+        self.reset(start_pos, goal_pos)
+
+    def reset(self, start_pos=None, goal_pos=None):
+        """
+        Clear the arrays so they can be reused for a new search, without allocating them again.
+        Only the cells seen by the previous search are cleared, like in `ArrayAstar.reset`.
+        """
+        super().reset(start_pos, goal_pos)
+        if self.seen:
+            seen = np.array(self.seen, dtype=np.int64)
+            for direction in (FORWARD, BACKWARD):
+                self.g[direction][seen] = UNREACHED
+                self.parent[direction][seen] = -1
+                self.closed[direction][seen] = False
+                self.latest[direction][seen] = 0
+            self.seen = []
+
+        self.start = self.adjacency.to_index(self.start_pos)
+        self.goal = self.adjacency.to_index(self.goal_pos)
+        self.expanded = [0, 0]
+        self.best = UNREACHED
+        self.meeting = -1
+        # distance to the goal minus distance to the start, computed in the loop without diagonal moves
+        self.balance = None
+        if self.adjacency.connectivity != 4:
+            self.balance = (self.adjacency.heuristic_field(self.goal_pos).astype(np.int64)
+                            - self.adjacency.heuristic_field(self.start_pos))
+
+    def find_path(self):
+        self.agenda_loop()
+        if self.get_cost() is None:
+            print("Could not find any path from start to end")
+        print(f'Found path after checking {self.get_expanded()} nodes '
+              f'({self.expanded[FORWARD]} forward, {self.expanded[BACKWARD]} backward)')
+
+    def agenda_loop(self):
+        """
+        Expands one node at a time from the direction with the lowest key, until the
+        stopping criterion proves that `best` is the cost of the shortest path.
+        """
+        indptr = self.adjacency.indptr_view
+        neighbours = self.adjacency.neighbours_view
+        costs = self.adjacency.costs_view
+        reverse_costs = self.adjacency.reverse_costs_view
+        balances = memoryview(self.balance) if self.balance is not None else None
+        g = [memoryview(array) for array in self.g]
+        parent = [memoryview(array) for array in self.parent]
+        closed = [memoryview(array) for array in self.closed]
+        latest = [memoryview(array) for array in self.latest]
+        width = self.adjacency.width
+        # The target of the forward search is the goal, and the start for the backward search
+        targets = [divmod(self.goal, width), divmod(self.start, width)]
+        goal_x, goal_y = targets[FORWARD]
+        start_x, start_y = targets[BACKWARD]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        seen = self.seen.append
+
+        heaps = [[], []]
+        insertions = 1
+        for direction, origin in ((FORWARD, self.start), (BACKWARD, self.goal)):
+            x, y = divmod(origin, width)
+            if balances is not None:
+                balance = balances[origin]
+            else:
+                balance = abs(goal_x - x) + abs(goal_y - y) - abs(start_x - x) - abs(start_y - y)
+            seen(origin)
+            g[direction][origin] = 0
+            heaps[direction].append((balance if direction == FORWARD else -balance, 0, origin))
+        if self.start == self.goal:
+            self.best, self.meeting = 0, self.start
+
+        while heaps[FORWARD] and heaps[BACKWARD]:
+            # The heap tops are lower bounds of the open keys, outdated entries
+            # can only have higher keys than the current entry of their node
+            if heaps[FORWARD][0][0] + heaps[BACKWARD][0][0] >= 2 * self.best:
+                break
+
+            direction = FORWARD if heaps[FORWARD][0][0] <= heaps[BACKWARD][0][0] else BACKWARD
+            other = BACKWARD - direction
+            heap = heaps[direction]
+            _, insertion, current = heappop(heap)
+            if insertion != latest[direction][current] or closed[direction][current]:
+                continue  # outdated entry
+            closed[direction][current] = True
+            self.expanded[direction] += 1
+
+            current_g = g[direction][current]
+            for i in range(indptr[current], indptr[current + 1]):
+                child = neighbours[i]
+                if closed[direction][child]:
+                    continue
+
+                step = costs[i] if direction == FORWARD else reverse_costs[i]
+                new_path_length = current_g + step
+                old_g = g[direction][child]
+                if new_path_length >= old_g:
+                    continue
+                if old_g == UNREACHED:
+                    seen(child)
+                g[direction][child] = new_path_length
+                parent[direction][child] = current
+
+                if balances is not None:
+                    balance = balances[child]
+                else:
+                    x, y = divmod(child, width)
+                    balance = abs(goal_x - x) + abs(goal_y - y) - abs(start_x - x) - abs(start_y - y)
+                key = 2 * new_path_length + (balance if direction == FORWARD else -balance)
+                latest[direction][child] = insertions
+                heappush(heap, (key, insertions, child))
+                insertions += 1
+
+                # the child has been reached from both sides, a complete path exists
+                other_g = g[other][child]
+                if other_g != UNREACHED and new_path_length + other_g < self.best:
+                    self.best = new_path_length + other_g
+                    self.meeting = child
+
+    def get_path(self) -> 'list[tuple[int, int]]':
+        if self.meeting == -1:
+            return []
+        path = []
+        index = self.meeting
+        while index != -1:
+            path.append(self.adjacency.to_pos(index))
+            index = int(self.parent[FORWARD][index])
+        path.reverse()
+        index = int(self.parent[BACKWARD][self.meeting])
+        while index != -1:
+            path.append(self.adjacency.to_pos(index))
+            index = int(self.parent[BACKWARD][index])
+        return path
+
+    def get_cost(self) -> int:
+        if self.meeting == -1:
+            return None
+        return self.adjacency.to_cost(int(self.best))
+
+    def get_expanded(self) -> int:
+        return self.expanded[FORWARD] + self.expanded[BACKWARD]
@@ -0,0 +1,64 @@
+import heapq
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import UNREACHED
+
+
+def dijkstra(map: Samfundet, sources, reverse=False) -> np.ndarray:
+    """
+    Find the cost of the shortest path from the closest source to every cell of the map.
+    :param map: the map to search
+    :param sources: positions to search from, all at distance 0
+    :param reverse: find the cost of the shortest path from every cell to the closest source
+        instead, which differs since moving into a cell costs the value of that cell
+    :return: flat array of costs indexed by `x * width + y`, UNREACHED for cells without a path.
+        With diagonal moves, the costs are in the units of the adjacency index, see `Adjacency.to_cost`
+    """
+    return distance_field(map, sources, reverse)[0]
+
+
+def distance_field(map: Samfundet, sources, reverse=False) -> 'tuple[np.ndarray, np.ndarray]':
+    """
+    Multi-source Dijkstra, finds the cost to (or from) the closest of all the sources for every cell
+    of the map in a single search, and which source that is. With the exits of a building as sources
+    and `reverse=True`, this is the cost from every cell to its nearest exit.
+    :param sources: positions to search from, all at distance 0
+    :param reverse: find the cost from every cell to the closest source, instead of from the sources
+    :return: flat arrays indexed by `x * width + y`, the costs (UNREACHED for cells without a path)
+        and the index into `sources` of the closest source (-1 for cells without a path)
+    """
+    adjacency = map.get_adjacency()
+    indptr = adjacency.indptr_view
+    neighbours = adjacency.neighbours_view
+    # Going backwards from a cell to a neighbour, the cost is the value of the cell itself
+    costs = adjacency.reverse_costs_view if reverse else adjacency.costs_view
+
+    distances = np.full(adjacency.size, UNREACHED, dtype=np.int64)
+    distance = memoryview(distances)
+    closest_sources = np.full(adjacency.size, -1, dtype=np.int64)
+    closest = memoryview(closest_sources)
+    heap = []
+    for number, pos in enumerate(sources):
+        index = adjacency.to_index(pos)
+        if distance[index] == 0:
+            continue  # listed twice
+        distance[index] = 0
+        closest[index] = number
+        heap.append((0, index))
+    heapq.heapify(heap)
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while heap:
+        current_distance, current = heappop(heap)
+        if current_distance > distance[current]:
+            continue  # outdated entry
+        for i in range(indptr[current], indptr[current + 1]):
+            child = neighbours[i]
+            new_distance = current_distance + costs[i]
+            if new_distance < distance[child]:
+                distance[child] = new_distance
+                closest[child] = closest[current]
+                heappush(heap, (new_distance, child))
+    return distances, closest_sources
@@ -0,0 +1,133 @@
+import heapq
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import UNREACHED
+from astar.dijkstra import dijkstra
+from astar.field_cache import FieldCache
+
+
+class DistanceFieldService:
+    """
+    Answers path queries to a few goals from their distance fields.
+
+    The distance field of a goal is the exact cost from every cell to the goal, found with one
+    backward Dijkstra from the goal. A path from any start is then found by always stepping to the
+    neighbour with the lowest cost of entering it plus its distance, which only looks at the cells
+    along the path. The fields are kept for the goals used most recently, until their total size
+    goes above `max_bytes`, and can also be used as `lower_bounds` for `Astar` and `ArrayAstar`.
+
+    When the goal moves to a neighbouring cell (like when `tick` moves the goal of task 5), the new
+    field is repaired from the old one instead of being found from scratch. The fields are only
+    valid for the cell values the map had when they were computed, call `clear` after changing them.
+    """
+
+    def __init__(self, map: Samfundet, max_bytes=256 * 2 ** 20):
+        self.map = map
+        self.adjacency = map.get_adjacency()
+        self.fields = FieldCache(max_bytes)
+        self.queries_answered = 0
+        self.refreshed = 0  # cells whose distance went down in the latest repair
+
+    def field(self, goal_pos) -> np.ndarray:
+        """
+        Get the cost from every cell to the goal, computed the first time it is needed.
+        :return: flat array indexed by `x * width + y`, UNREACHED for cells without a path
+        """
+        field = self.fields.get(goal_pos)
+        if field is not None:
+            return field
+        key = FieldCache.key(goal_pos)
+        return self.fields.store(key, dijkstra(self.map, [key], reverse=True))
+
+    def query(self, start_pos, goal_pos=None) -> 'tuple[list[tuple[int, int]], int]':
+        """
+        Find the shortest path from the start to the goal (the current goal of the map by default).
+        :return: the path (empty if there is none) and its cost (None if there is no path)
+        """
+        field = self.field(goal_pos if goal_pos is not None else self.map.get_goal_pos())
+        self.queries_answered += 1
+        index = self.adjacency.to_index(start_pos)
+        if field[index] == UNREACHED:
+            return [], None
+
+        distance = memoryview(field)
+        indptr = self.adjacency.indptr_view
+        neighbours = self.adjacency.neighbours_view
+        costs = self.adjacency.costs_view
+        path = [index]
+        while distance[index] != 0:
+            best = min(range(indptr[index], indptr[index + 1]), key=lambda i: costs[i] + distance[neighbours[i]])
+            index = neighbours[best]
+            path.append(index)
+        return [self.adjacency.to_pos(index) for index in path], self.adjacency.to_cost(int(field[path[0]]))
+
+    def queries(self, pairs: 'Iterable[tuple]') -> 'Iterator[tuple[list[tuple[int, int]], int]]':
+        """
+        Answer a stream of (start_pos, goal_pos) queries, yielding the path and cost of each
+        query in the same order as they were given. The pairs are consumed lazily.
+        """
+        for start_pos, goal_pos in pairs:
+            yield self.query(start_pos, goal_pos)
+
+    def move_goal(self, old_goal_pos, goal_pos):
+        """
+        Repair the field of the old goal into the field of a neighbouring new goal, if it is cached.
+
+        Every cell can reach the new goal through the old one, for its old distance plus the cost
+        of moving from the old goal to the new one, which is its new distance unless it has a
+        cheaper path that does not pass the old goal. Starting from these upper bounds, Dijkstra
+        from the new goal only has to visit the cells that have such a path.
+        """
+        old = self.fields.get(old_goal_pos)
+        if old is None:
+            return
+        indptr = self.adjacency.indptr_view
+        neighbours = self.adjacency.neighbours_view
+        costs = self.adjacency.costs_view
+        old_goal = self.adjacency.to_index(old_goal_pos)
+        goal = self.adjacency.to_index(goal_pos)
+        moves = [costs[i] for i in range(indptr[old_goal], indptr[old_goal + 1]) if neighbours[i] == goal]
+        if not moves:
+            return  # not a neighbour, or a wall
+
+        field = np.where(old == UNREACHED, UNREACHED, old + moves[0])
+        field[goal] = 0
+        distance = memoryview(field)
+        # Going backwards from a cell to a neighbour, the cost is the value of the cell itself
+        reverse_costs = self.adjacency.reverse_costs_view
+        heap = [(0, goal)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        refreshed = 0
+        while heap:
+            current_distance, current = heappop(heap)
+            if current_distance > distance[current]:
+                continue  # outdated entry
+            refreshed += 1
+            for i in range(indptr[current], indptr[current + 1]):
+                child = neighbours[i]
+                new_distance = current_distance + reverse_costs[i]
+                if new_distance < distance[child]:
+                    distance[child] = new_distance
+                    heappush(heap, (new_distance, child))
+        self.refreshed = refreshed
+        self.fields.store(goal_pos, field)
+
+    def tick(self) -> 'list[int]':
+        """
+        Advance the map one tick, and repair the field of the goal if it moved.
+        :return: the goal position after the tick
+        """
+        old_goal_pos = list(self.map.get_goal_pos())
+        goal_pos = self.map.tick()
+        if list(goal_pos) != old_goal_pos:
+            self.move_goal(old_goal_pos, goal_pos)
+        return goal_pos
+
+    def clear(self):
+        """
+        Drop every field, needed when the cell values of the map change.
+        """
+        self.fields.clear()
@@ -0,0 +1,218 @@
+import heapq
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import ArrayAstar, UNREACHED
+from astar.path_finder import PathFinder
+
+
+class DStarLite(PathFinder):
+    """
+    Incremental planner (D* Lite) for following a goal that moves, like in task 5.
+
+    The search tree is rooted at the start position and kept between calls, where `g` is the
+    cost of the best known path from the start to a cell and `rhs` the cost looking one step
+    back (the cheapest neighbour's g plus the cost of entering the cell). Cells where the two
+    differ are inconsistent and kept in the open list, and only those are expanded when
+    replanning. When the goal moves, only the heuristic changes: instead of reordering the
+    open list, the distance the goal moved is added to `km`, which is part of every new key.
+    Old keys are then too low, and are recalculated when they reach the top of the open list.
+
+    Works on a wall padded, flattened copy of the map (like `JumpPointSearch`), which is
+    compared with the map on every tick to find cells whose cost changed.
+    """
+
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None):
+        super().__init__(map)
+        if map.connectivity != 4:
+            raise ValueError('DStarLite only supports maps without diagonal moves')
+        self.width = map.int_map.shape[1] + 2
+        self.values = np.pad(map.int_map, 1, constant_values=-1).astype(np.int64).ravel()
+        self.offsets = (1, -1, -self.width, self.width)
+
+        size = self.values.size
+        self.g = np.empty(size, dtype=np.int64)
+        self.rhs = np.empty(size, dtype=np.int64)
+        # insertion number of the latest heap entry of every cell, -1 when not in the open list
+        self.latest = np.empty(size, dtype=np.int64)
+        self.ticks: list[dict] = []
+        self.reset(start_pos, goal_pos)
+
+    def reset(self, start_pos=None, goal_pos=None):
+        """
+        Throw away the search tree and start over, the next `agenda_loop` plans from scratch.
+        """
+        super().reset(start_pos, goal_pos)
+        self.g.fill(UNREACHED)
+        self.rhs.fill(UNREACHED)
+        self.latest.fill(-1)
+        self.heap: list[tuple] = []
+        self.insertions = 0
+        self.km = 0
+        self.expanded = 0
+
+        self.start = self.to_index(self.start_pos)
+        self.goal = self.to_index(self.goal_pos)
+        self.rhs[self.start] = 0
+        self.push(self.start)
+
+    def to_index(self, pos) -> int:
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def to_pos(self, index: int) -> 'tuple[int, int]':
+        x, y = divmod(index, self.width)
+        return x - 1, y - 1
+
+    def heuristic(self, index: int) -> int:
+        x, y = divmod(index, self.width)
+        goal_x, goal_y = divmod(self.goal, self.width)
+        return abs(goal_x - x) + abs(goal_y - y)
+
+    def key(self, index: int) -> 'tuple[int, int]':
+        best = min(self.g[index], self.rhs[index])
+        if best == UNREACHED:
+            return UNREACHED, UNREACHED
+        return best + self.heuristic(index) + self.km, best
+
+    def push(self, index: int):
+        self.latest[index] = self.insertions
+        heapq.heappush(self.heap, (*self.key(index), self.insertions, index))
+        self.insertions += 1
+
+    def top_key(self) -> 'tuple[int, int]':
+        """
+        Get the lowest key in the open list, after dropping outdated entries from the top.
+        """
+        while self.heap and self.heap[0][2] != self.latest[self.heap[0][3]]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return UNREACHED, UNREACHED
+        return self.heap[0][:2]
+
+    def update_vertex(self, index: int):
+        """
+        Recalculate rhs for the cell, and put it in the open list only if it is inconsistent.
+        """
+        values = self.values
+        if index != self.start:
+            if values[index] == -1:
+                self.rhs[index] = UNREACHED
+            else:
+                best = UNREACHED
+                for offset in self.offsets:
+                    neighbour_g = self.g[index + offset]
+                    if neighbour_g < best and values[index + offset] != -1:
+                        best = neighbour_g
+                self.rhs[index] = best + values[index] if best != UNREACHED else UNREACHED
+        self.latest[index] = -1
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+
+    def agenda_loop(self):
+        """
+        Expand inconsistent cells until the goal is consistent and no cell in the open
+        list could lead to a cheaper path to it.
+        """
+        g, rhs = self.g, self.rhs
+        while self.top_key() < self.key(self.goal) or rhs[self.goal] != g[self.goal]:
+            old_key = self.heap[0][:2]
+            index = heapq.heappop(self.heap)[3]
+            self.latest[index] = -1
+            new_key = self.key(index)
+            if old_key < new_key:
+                # key was calculated before the goal moved
+                self.push(index)
+                continue
+
+            self.expanded += 1
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+            else:
+                g[index] = UNREACHED
+                self.update_vertex(index)
+            for offset in self.offsets:
+                if self.values[index + offset] != -1:
+                    self.update_vertex(index + offset)
+
+    def update_cells(self) -> int:
+        """
+        Compare the stored cell values with the map, and repair the search tree around every
+        cell whose value has changed.
+        :return: the number of changed cells
+        """
+        values = np.pad(self.map.int_map, 1, constant_values=-1).ravel()
+        changed = np.flatnonzero(values != self.values)
+        for index in changed.tolist():
+            self.values[index] = values[index]
+            self.update_vertex(index)
+            for offset in self.offsets:
+                self.update_vertex(index + offset)
+        return len(changed)
+
+    def move_goal(self, goal_pos):
+        """
+        Move the goal without changing the search tree, only the keys are affected.
+        """
+        goal = self.to_index(goal_pos)
+        old_x, old_y = divmod(self.goal, self.width)
+        new_x, new_y = divmod(goal, self.width)
+        self.km += abs(old_x - new_x) + abs(old_y - new_y)
+        self.goal = goal
+        self.goal_pos = list(goal_pos)
+
+    def tick(self, compare=True) -> dict:
+        """
+        Advance the map one tick (which might move the goal), then repair the path.
+        :param compare: also plan from scratch with `ArrayAstar` when the goal moved or a cell
+            changed, to report how much work was saved
+        :return: a summary of the tick, also appended to `self.ticks`
+        """
+        goal_pos = self.map.tick()
+        changed = self.update_cells()
+        moved = list(goal_pos) != list(self.goal_pos)
+        if moved:
+            self.move_goal(goal_pos)
+
+        expanded_before = self.expanded
+        self.agenda_loop()
+        summary = {
+            'tick': len(self.ticks) + 1,
+            'goal_pos': tuple(self.goal_pos),
+            'changed_cells': changed,
+            'cost': self.get_cost(),
+            'expanded': self.expanded - expanded_before,
+        }
+        if compare:
+            # planning from scratch is only needed when something changed
+            full_expanded = 0
+            if moved or changed:
+                full = ArrayAstar(self.map, self.start_pos, self.goal_pos)
+                full.agenda_loop()
+                full_expanded = full.get_expanded()
+            summary['full_replanning_expanded'] = full_expanded
+            summary['saved'] = full_expanded - summary['expanded']
+        self.ticks.append(summary)
+        return summary
+
+    def get_path(self) -> 'list[tuple[int, int]]':
+        """
+        Walk from the goal back to the start, always stepping to the neighbour with the lowest g.
+        """
+        if self.g[self.goal] == UNREACHED:
+            return []
+        path = [self.goal]
+        index = self.goal
+        while index != self.start:
+            index = min((index + offset for offset in self.offsets
+                         if self.values[index + offset] != -1), key=lambda cell: self.g[cell])
+            path.append(index)
+        return [self.to_pos(index) for index in reversed(path)]
+
+    def get_cost(self) -> int:
+        if self.g[self.goal] == UNREACHED:
+            return None
+        return int(self.g[self.goal])
+
+    def get_expanded(self) -> int:
+        return self.expanded
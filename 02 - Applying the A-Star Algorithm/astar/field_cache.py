@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FieldCache:
+    """
+    Keeps the fields (flat arrays with a value for every cell) of the goals used most recently.
+
+    The least recently used fields are dropped when their total size goes above `max_bytes`, and
+    a field larger than that is not kept at all. Stored fields are made read-only, since every
+    search to the goal shares them. Used by `HeuristicCache` and `DistanceFieldService`.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.fields: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.size = 0  # bytes used by the fields
+
+    @staticmethod
+    def key(goal_pos) -> 'tuple[int, int]':
+        return int(goal_pos[0]), int(goal_pos[1])
+
+    def get(self, goal_pos) -> np.ndarray:
+        """
+        Get the field of the goal and mark it as used, or None if it is not kept.
+        """
+        key = self.key(goal_pos)
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+        return field
+
+    def store(self, goal_pos, field: np.ndarray) -> np.ndarray:
+        """
+        Keep the field of the goal, replacing any earlier field of the same goal.
+        :return: the field, now read-only
+        """
+        key = self.key(goal_pos)
+        field.flags.writeable = False
+        if key in self.fields:
+            self.size -= self.fields.pop(key).nbytes
+        if field.nbytes <= self.max_bytes:
+            self.fields[key] = field
+            self.size += field.nbytes
+            while self.size > self.max_bytes:
+                _, oldest = self.fields.popitem(last=False)
+                self.size -= oldest.nbytes
+        return field
+
+    def clear(self):
+        self.fields.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.fields)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.field_cache import FieldCache
+
+
+class HeuristicCache:
+    """
+    Keeps the heuristic of every cell for the goals searched for most recently.
+
+    Many searches share a goal, like an exit or a service desk. The first search to a goal
+    computes the heuristic of every cell at once with numpy (the Manhattan or octile distance
+    from `Adjacency.heuristic_field`, or the field of the wrapped `lower_bounds`), and later
+    searches to the same goal only look it up. Used as `lower_bounds` for `Astar` and
+    `ArrayAstar`, and can be shared between engines on the same map.
+
+    The least recently used fields are dropped when their total size goes above `max_bytes`.
+    The fields are only valid for the cell values the map had when they were computed, call
+    `clear` after changing the map.
+    """
+
+    def __init__(self, map: Samfundet, lower_bounds=None, max_bytes=256 * 2 ** 20):
+        """
+        :param map: the map to compute the heuristic for
+        :param lower_bounds: an object with a `field(goal_pos)` method like `Landmarks`, whose fields
+            are cached. Uses the Manhattan distance (octile with diagonal moves) when not given.
+        :param max_bytes: memory the cached fields can use
+        """
+        self.adjacency = map.get_adjacency()
+        self.lower_bounds = lower_bounds
+        self.fields = FieldCache(max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def field(self, goal_pos) -> np.ndarray:
+        """
+        Get the heuristic of every cell for the goal, computed the first time it is needed.
+        The array is read-only, since every search to the goal shares it.
+        :return: flat array indexed by `x * width + y`
+        """
+        field = self.fields.get(goal_pos)
+        if field is not None:
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        key = FieldCache.key(goal_pos)
+        if self.lower_bounds is not None:
+            field = self.lower_bounds.field(key)
+        else:
+            field = self.adjacency.heuristic_field(key)
+        return self.fields.store(key, field)
+
+    def clear(self):
+        """
+        Drop every cached field, needed when the cell values of the map change.
+        """
+        self.fields.clear()
@@ -0,0 +1,393 @@
+import hashlib
+import heapq
+import os
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.path_finder import PathFinder
+
+RIGHT, DOWN = 0, 1
+# Entrances at least this wide get a transition at both ends instead of one in the middle
+WIDE_ENTRANCE = 6
+
+
+class ClusterGraph:
+    """
+    Abstract graph over a map for hierarchical path finding (HPA*).
+
+    The map is split into square clusters of `cluster_size` cells. Where two neighbouring
+    clusters touch, every run of cells that is open on both sides is an entrance, and each
+    entrance gets one or two transitions, pairs of cells facing each other across the border.
+    Those cells are the nodes of the abstract graph. Nodes in the same cluster are connected by
+    the cost of the shortest path between them inside the cluster, and the two cells of a
+    transition by the cost of stepping across.
+
+    The graph is saved beside the map file (`samfundet_1.hpa.npz` for `samfundet_1.csv`) and
+    loaded when the cell values and cluster size match. `update` rebuilds only the clusters
+    around cells that changed, in memory, call `save` to keep the updated graph.
+    """
+
+    def __init__(self, map: Samfundet, cluster_size=10, filename: str = None):
+        """
+        :param map: the map to build the graph for
+        :param cluster_size: width and height of a cluster, in cells
+        :param filename: where to save the graph, defaults to beside the map file. Maps that
+            were not read from a file are not saved unless a filename is given.
+        """
+        if map.connectivity != 4:
+            raise ValueError('ClusterGraph only supports maps without diagonal moves')
+        self.map = map
+        self.cluster_size = cluster_size
+        self.height, self.width = map.int_map.shape
+        self.clusters_x = -(-self.height // cluster_size)
+        self.clusters_y = -(-self.width // cluster_size)
+        self.filename = filename if filename is not None else self.default_filename(map)
+        # cell values the graph was built for, compared with the map by update
+        self.values = np.array(map.int_map, dtype=np.int8)
+
+        # transitions (cell in the first cluster, cell in the second) of every border
+        self.transitions: dict[tuple[int, int, int], list[tuple[int, int]]] = {}
+        # shortest path costs between the nodes of every cluster
+        self.intra: dict[tuple[int, int], dict[tuple[int, int], int]] = {}
+        # abstract graph, the (node, cost) pairs every node is connected to
+        self.edges: dict[int, list[tuple[int, int]]] = {}
+        self.expanded = 0  # cells expanded by searches inside clusters
+
+        if not self.load():
+            self.build()
+            self.save()
+
+    @staticmethod
+    def default_filename(map: Samfundet) -> str:
+        if map.path_to_map is None:
+            return None
+        return os.path.splitext(map.path_to_map)[0] + '.hpa.npz'
+
+    def checksum(self) -> str:
+        return hashlib.sha1(self.values.tobytes()).hexdigest()
+
+    def build(self):
+        for border in self.get_borders():
+            self.transitions[border] = self.find_transitions(border)
+        for cx in range(self.clusters_x):
+            for cy in range(self.clusters_y):
+                self.connect_cluster((cx, cy))
+        self.connect()
+
+    def save(self):
+        if self.filename is None:
+            return
+        transitions = [(*border, a, b) for border, pairs in self.transitions.items() for a, b in pairs]
+        intra = [(a, b, cost) for costs in self.intra.values() for (a, b), cost in costs.items()]
+        np.savez(self.filename, checksum=self.checksum(), cluster_size=self.cluster_size,
+                 transitions=np.array(transitions, dtype=np.int64).reshape(-1, 5),
+                 intra=np.array(intra, dtype=np.int64).reshape(-1, 3))
+
+    def load(self) -> bool:
+        """
+        Load the saved graph, unless it is missing or for other cell values or cluster size.
+        :return: whether the graph was loaded
+        """
+        if self.filename is None or not os.path.exists(self.filename):
+            return False
+        with np.load(self.filename) as data:
+            if str(data['checksum']) != self.checksum() or int(data['cluster_size']) != self.cluster_size:
+                return False
+            transitions = data['transitions'].tolist()
+            intra = data['intra'].tolist()
+
+        self.transitions = {border: [] for border in self.get_borders()}
+        for cx, cy, direction, a, b in transitions:
+            self.transitions[cx, cy, direction].append((a, b))
+        self.intra = {(cx, cy): {} for cx in range(self.clusters_x) for cy in range(self.clusters_y)}
+        for a, b, cost in intra:
+            self.intra[self.get_cluster(a)][a, b] = cost
+        self.connect()
+        return True
+
+    def get_borders(self) -> 'list[tuple[int, int, int]]':
+        """
+        Get every border between two clusters, as the first cluster and the direction of the second.
+        """
+        borders = []
+        for cx in range(self.clusters_x):
+            for cy in range(self.clusters_y):
+                if cy + 1 < self.clusters_y:
+                    borders.append((cx, cy, RIGHT))
+                if cx + 1 < self.clusters_x:
+                    borders.append((cx, cy, DOWN))
+        return borders
+
+    def get_cluster(self, index: int) -> 'tuple[int, int]':
+        x, y = divmod(index, self.width)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def get_bounds(self, cluster) -> 'tuple[int, int, int, int]':
+        """
+        :return: the first and last + 1 row and column of the cluster
+        """
+        size = self.cluster_size
+        x, y = cluster[0] * size, cluster[1] * size
+        return x, min(x + size, self.height), y, min(y + size, self.width)
+
+    def get_nodes(self, cluster) -> 'set[int]':
+        """
+        Get the transition cells inside the cluster.
+        """
+        cx, cy = cluster
+        nodes = set()
+        for border, first in [((cx, cy, RIGHT), True), ((cx, cy, DOWN), True),
+                              ((cx, cy - 1, RIGHT), False), ((cx - 1, cy, DOWN), False)]:
+            for a, b in self.transitions.get(border, []):
+                nodes.add(a if first else b)
+        return nodes
+
+    def find_transitions(self, border) -> 'list[tuple[int, int]]':
+        """
+        Find the entrances along a border, and place transitions in them.
+        """
+        cx, cy, direction = border
+        x0, x1, y0, y1 = self.get_bounds((cx, cy))
+        if direction == RIGHT:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        else:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:  # the extra pair ends the last run
+            if a is not None and self.values[a] != -1 and self.values[b] != -1:
+                run.append((a[0] * self.width + a[1], b[0] * self.width + b[1]))
+                continue
+            if len(run) >= WIDE_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return transitions
+
+    def connect_cluster(self, cluster):
+        """
+        Find the cost of the shortest path inside the cluster between every pair of its nodes.
+        """
+        nodes = self.get_nodes(cluster)
+        costs = {}
+        for node in nodes:
+            distances, _ = self.search_cluster(node, cluster)
+            for other in nodes:
+                if other != node and other in distances:
+                    costs[node, other] = distances[other]
+        self.intra[cluster] = costs
+
+    def connect(self):
+        """
+        Put the abstract graph together from the transitions and the costs inside the clusters.
+        """
+        values = self.values.ravel()
+        edges: dict[int, list[tuple[int, int]]] = {}
+        for pairs in self.transitions.values():
+            for a, b in pairs:
+                edges.setdefault(a, []).append((b, int(values[b])))
+                edges.setdefault(b, []).append((a, int(values[a])))
+        for costs in self.intra.values():
+            for (a, b), cost in costs.items():
+                edges.setdefault(a, []).append((b, cost))
+        self.edges = edges
+
+    def update(self, cells=None) -> int:
+        """
+        Rebuild the parts of the graph around cells whose value has changed in the map.
+        The saved graph is left as it is, so repairs stay cheap.
+        :param cells: positions of the changed cells, by default the whole map is compared
+        :return: the number of clusters that were rebuilt
+        """
+        int_map = np.asarray(self.map.int_map)
+        if cells is None:
+            changed = np.argwhere(int_map != self.values).tolist()
+        else:
+            changed = [pos for pos in cells if int_map[pos[0], pos[1]] != self.values[pos[0], pos[1]]]
+        if not changed:
+            return 0
+
+        clusters = set()
+        for x, y in changed:
+            self.values[x, y] = int_map[x, y]
+            clusters.add(self.get_cluster(x * self.width + y))
+        # The entrances on the borders of the changed clusters might have moved,
+        # which changes the nodes of the clusters on the other side as well
+        borders = set()
+        for cx, cy in clusters:
+            borders.update([(cx, cy, RIGHT), (cx, cy, DOWN), (cx, cy - 1, RIGHT), (cx - 1, cy, DOWN)])
+        rebuilt = set(clusters)
+        for border in borders & self.transitions.keys():
+            self.transitions[border] = self.find_transitions(border)
+            cx, cy, direction = border
+            rebuilt.update([(cx, cy), (cx, cy + 1) if direction == RIGHT else (cx + 1, cy)])
+        for cluster in rebuilt:
+            self.connect_cluster(cluster)
+        self.connect()
+        return len(rebuilt)
+
+    def search_cluster(self, source: int, cluster, target: int = None, reverse=False) -> 'tuple[dict, dict]':
+        """
+        Dijkstra from `source`, without leaving the cluster.
+        :param target: stop when this cell is reached
+        :param reverse: find the cost from every cell to the source instead
+        :return: the cost and parent of every reached cell
+        """
+        adjacency = self.map.get_adjacency()
+        indptr = adjacency.indptr_view
+        neighbours = adjacency.neighbours_view
+        costs = adjacency.costs_view
+        values = memoryview(self.values.ravel())
+        width = self.width
+        x0, x1, y0, y1 = self.get_bounds(cluster)
+
+        distances = {source: 0}
+        parents = {source: None}
+        heap = [(0, source)]
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if distance > distances[current]:
+                continue
+            self.expanded += 1
+            if current == target:
+                break
+            for i in range(indptr[current], indptr[current + 1]):
+                child = neighbours[i]
+                x, y = divmod(child, width)
+                if not (x0 <= x < x1 and y0 <= y < y1):
+                    continue
+                new_distance = distance + (values[current] if reverse else costs[i])
+                if new_distance < distances.get(child, new_distance + 1):
+                    distances[child] = new_distance
+                    parents[child] = current
+                    heapq.heappush(heap, (new_distance, child))
+        return distances, parents
+
+
+class HierarchicalAstar(PathFinder):
+    """
+    Hierarchical A* (HPA*) for large maps.
+
+    The start and goal are connected to the nodes of their clusters, then A* searches the
+    abstract graph of a `ClusterGraph`, which has a few nodes per cluster instead of one per cell.
+    Every step of the abstract path is then refined into cells: steps across a border are a single
+    move, and steps inside a cluster are searched for within that cluster.
+
+    The path is usually a few percent more expensive than the shortest path, since it has to pass
+    through the transitions. `get_expanded` counts both the abstract nodes and the cells expanded
+    while connecting the start and goal to their clusters.
+    """
+
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None, graph: ClusterGraph = None,
+                 cluster_size=10):
+        """
+        :param graph: the abstract graph to search, shared between searches on the same map.
+            One is built (or loaded) with the given cluster size if not given.
+        """
+        super().__init__(map)
+        if map.connectivity != 4:
+            raise ValueError('HierarchicalAstar only supports maps without diagonal moves')
+        self.graph = graph if graph is not None else ClusterGraph(map, cluster_size)
+        self.width = self.graph.width
+        self.reset(start_pos, goal_pos)
+
+    def reset(self, start_pos=None, goal_pos=None):
+        super().reset(start_pos, goal_pos)
+        self.start = self.start_pos[0] * self.width + self.start_pos[1]
+        self.goal = self.goal_pos[0] * self.width + self.goal_pos[1]
+        self.abstract_path: list[int] = []
+        self.cost = None
+        self.expanded = 0
+
+    def agenda_loop(self):
+        graph = self.graph
+        cells_expanded = graph.expanded
+        start_cluster = graph.get_cluster(self.start)
+        goal_cluster = graph.get_cluster(self.goal)
+
+        # Temporary edges from the start to the nodes of its cluster, and from the nodes of the
+        # goals cluster to the goal (and directly from the start if they share a cluster)
+        from_start, _ = graph.search_cluster(self.start, start_cluster)
+        start_edges = [(node, from_start[node]) for node in graph.get_nodes(start_cluster)
+                       if node in from_start and node != self.start]
+        if start_cluster == goal_cluster and self.goal in from_start:
+            start_edges.append((self.goal, from_start[self.goal]))
+        to_goal, _ = graph.search_cluster(self.goal, goal_cluster, reverse=True)
+        goal_edges = {node: to_goal[node] for node in graph.get_nodes(goal_cluster)
+                      if node in to_goal and node != self.goal}
+
+        self.abstract_path, self.cost = self.search(start_edges, goal_edges)
+        self.expanded += graph.expanded - cells_expanded
+
+    def search(self, start_edges, goal_edges) -> 'tuple[list[int], int]':
+        """
+        A* over the abstract graph, with the temporary start and goal edges added.
+        :return: the abstract path and its cost, or an empty path and None
+        """
+        width = self.width
+        goal_x, goal_y = divmod(self.goal, width)
+        g = {self.start: 0}
+        parents = {self.start: None}
+        closed = set()
+        heap = [(0, 0, self.start)]
+        insertions = 1
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+            if current == self.goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1], g[self.goal]
+
+            if current == self.start:
+                # the start might be a node itself, with an edge across the border
+                edges = start_edges + self.graph.edges.get(current, [])
+            else:
+                edges = self.graph.edges.get(current, [])
+                if current in goal_edges:
+                    edges = edges + [(self.goal, goal_edges[current])]
+            for child, cost in edges:
+                new_g = g[current] + cost
+                if child in closed or new_g >= g.get(child, new_g + 1):
+                    continue
+                g[child] = new_g
+                parents[child] = current
+                x, y = divmod(child, width)
+                heapq.heappush(heap, (new_g + abs(goal_x - x) + abs(goal_y - y), insertions, child))
+                insertions += 1
+        return [], None
+
+    def get_path(self) -> 'list[tuple[int, int]]':
+        """
+        Refine the abstract path into cells, searching inside a cluster for every step within one.
+        """
+        if self.cost is None:
+            return []
+        graph = self.graph
+        path = [self.start]
+        for previous, node in zip(self.abstract_path, self.abstract_path[1:]):
+            cluster = graph.get_cluster(previous)
+            if graph.get_cluster(node) != cluster:
+                path.append(node)  # across a border
+                continue
+            _, parents = graph.search_cluster(previous, cluster, target=node)
+            steps = []
+            while node != previous:
+                steps.append(node)
+                node = parents[node]
+            path += steps[::-1]
+        return [divmod(index, self.width) for index in path]
+
+    def get_cost(self) -> int:
+        return self.cost
+
+    def get_expanded(self) -> int:
+        return self.expanded
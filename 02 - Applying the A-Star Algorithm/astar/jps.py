@@ -0,0 +1,218 @@
+import heapq
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import UNREACHED
+from astar.path_finder import PathFinder
+
+
+class JumpPointSearch(PathFinder):
+    """
+    Jump Point Search for 4-connected grids, extended to the weighted Samfundet maps.
+
+    Inside regions where every cell costs 1, most cells have many equally short paths through
+    them. Instead of expanding every cell, the search moves ("jumps") in a straight line until
+    it reaches a cell where the path could have to turn (a jump point), and only those cells
+    are added to the open list. When moving vertically, every cell also checks for jump points
+    to its left and right, and a horizontal jump stops where a cell above or below it can not
+    be reached from the row it came from.
+
+    Cells costing more than 1 are treated as the edge of the uniform region: a jump stops at any
+    weighted cell and at every cell next to one, and such cells are expanded in all four
+    directions like in normal A*. The search therefore stays optimal on the weighted maps.
+
+    Works on a wall padded, flattened copy of the map, so the index of a cell is
+    `(x + 1) * width + y + 1`.
+    """
+
+    def __init__(self, map: Samfundet, start_pos=None, goal_pos=None):
+        super().__init__(map)
+        if map.connectivity != 4:
+            raise ValueError('JumpPointSearch only supports maps without diagonal moves')
+        values = np.pad(map.int_map, 1, constant_values=-1)
+        self.width = values.shape[1]
+
+        weighted = values > 1
+        # cells where jumps stop, weighted cells and their neighbours
+        stop = weighted.copy()
+        stop[1:, :] |= weighted[:-1, :]
+        stop[:-1, :] |= weighted[1:, :]
+        stop[:, 1:] |= weighted[:, :-1]
+        stop[:, :-1] |= weighted[:, 1:]
+
+        self.values = values.astype(np.int8).ravel()
+        self.walkable = (values != -1).ravel()
+        self.free = (values == 1).ravel()
+        self.stop = stop.ravel()
+        # memoryviews give fast access to the elements as plain python values
+        self.values_view = memoryview(self.values)
+        self.walkable_view = memoryview(self.walkable)
+        self.free_view = memoryview(self.free)
+        self.stop_view = memoryview(self.stop)
+
+        size = self.values.size
+        self.g = np.full(size, UNREACHED, dtype=np.int64)  # cost from start to each jump point
+        self.parent = np.full(size, -1, dtype=np.int64)  # index of the previous jump point
+        self.closed = np.zeros(size, dtype=np.bool_)
+        # insertion number of the latest heap entry of every cell, older entries are outdated
+        self.latest = np.zeros(size, dtype=np.int64)
+        self.seen = []  # jump points the latest search wrote to, the only ones reset needs to clear
+        self.reset(start_pos, goal_pos)
+
+    def reset(self, start_pos=None, goal_pos=None):
+        """
+        Clear the arrays so they can be reused for a new search, without allocating them again.
+        Only the cells seen by the previous search are cleared, like in `ArrayAstar.reset`.
+        """
+        super().reset(start_pos, goal_pos)
+        if self.seen:
+            seen = np.array(self.seen, dtype=np.int64)
+            self.g[seen] = UNREACHED
+            self.parent[seen] = -1
+            self.closed[seen] = False
+            self.latest[seen] = 0
+            self.seen = []
+
+        self.start = self.to_index(self.start_pos)
+        self.goal = self.to_index(self.goal_pos)
+        self.expanded = 0
+        self.goal_found = False
+
+    def to_index(self, pos) -> int:
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def to_pos(self, index: int) -> 'tuple[int, int]':
+        x, y = divmod(index, self.width)
+        return x - 1, y - 1
+
+    def agenda_loop(self):
+        """
+        A* where the children of a node are the jump points found from it, instead of its neighbours.
+        """
+        g = memoryview(self.g)
+        parent = memoryview(self.parent)
+        closed = memoryview(self.closed)
+        latest = memoryview(self.latest)
+        values = self.values_view
+        width = self.width
+        goal_x, goal_y = divmod(self.goal, width)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        seen = self.seen.append
+
+        start_x, start_y = divmod(self.start, width)
+        seen(self.start)
+        g[self.start] = 0
+        heap = [(abs(goal_x - start_x) + abs(goal_y - start_y), 0, self.start)]
+        insertions = 1
+
+        while heap:
+            _, insertion, current = heappop(heap)
+            if insertion != latest[current] or closed[current]:
+                continue  # outdated entry
+            closed[current] = True
+            self.expanded += 1
+
+            if current == self.goal:
+                self.goal_found = True
+                return
+
+            current_g = g[current]
+            for step in self.get_directions(current, parent[current]):
+                jump_point = self.jump(current, step)
+                if jump_point is None:
+                    continue
+                child, distance = jump_point
+                if closed[child]:
+                    continue
+
+                # every cell before the jump point costs 1
+                new_path_length = current_g + distance - 1 + values[child]
+                old_g = g[child]
+                if new_path_length >= old_g:
+                    continue
+                if old_g == UNREACHED:
+                    seen(child)
+                g[child] = new_path_length
+                parent[child] = current
+
+                x, y = divmod(child, width)
+                latest[child] = insertions
+                heappush(heap, (new_path_length + abs(goal_x - x) + abs(goal_y - y), insertions, child))
+                insertions += 1
+
+    def get_directions(self, index: int, parent: int) -> 'tuple[int, ...]':
+        """
+        Get the directions (as index offsets) to search from the given node. Nodes without a parent
+        and nodes at the edge of a uniform region are searched in every direction, otherwise the
+        search continues straight ahead and to both sides, never back towards the parent.
+        """
+        width = self.width
+        if parent == -1 or self.stop_view[index]:
+            return (1, -1, -width, width)
+        difference = index - parent
+        if abs(difference) < width:
+            step = 1 if difference > 0 else -1
+            return (step, width, -width)
+        step = width if difference > 0 else -width
+        return (step, 1, -1)
+
+    def jump(self, index: int, step: int) -> 'tuple[int, int]':
+        """
+        Move from `index` in the direction `step` until reaching a jump point.
+        :return: the index of the jump point and the number of steps taken to reach it,
+            or None if a wall is reached first.
+        """
+        walkable = self.walkable_view
+        free = self.free_view
+        stop = self.stop_view
+        horizontal = step == 1 or step == -1
+        side = self.width if horizontal else 1  # offset to the cells beside the line of movement
+        distance = 0
+        while True:
+            index += step
+            distance += 1
+            if not walkable[index]:
+                return None
+            if index == self.goal or stop[index]:
+                return index, distance
+
+            # A forced neighbour is a cell beside us that can not be reached (as cheaply) from
+            # the cell beside the previous one, so a path might have to turn here.
+            behind = index - step
+            if (walkable[index + side] and not free[behind + side]) or \
+                    (walkable[index - side] and not free[behind - side]):
+                return index, distance
+
+            # Moving vertically, turning left or right here might lead to a jump point
+            if not horizontal and (self.jump(index, 1) is not None or self.jump(index, -1) is not None):
+                return index, distance
+
+    def get_path(self) -> 'list[tuple[int, int]]':
+        """
+        Follow the parents from the goal back to the start, filling in the straight
+        line of cells between every pair of jump points.
+        """
+        if not self.goal_found:
+            return []
+        path = [self.goal]
+        index = self.goal
+        while self.parent[index] != -1:
+            previous = int(self.parent[index])
+            difference = index - previous
+            if abs(difference) < self.width:
+                step = 1 if difference > 0 else -1
+            else:
+                step = self.width if difference > 0 else -self.width
+            for cell in range(index - step, previous - step, -step):
+                path.append(cell)
+            index = previous
+        return [self.to_pos(index) for index in reversed(path)]
+
+    def get_cost(self) -> int:
+        if not self.goal_found:
+            return None
+        return int(self.g[self.goal])
+
+    def get_expanded(self) -> int:
+        return self.expanded
@@ -0,0 +1,131 @@
+import hashlib
+import os
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import UNREACHED
+from astar.dijkstra import dijkstra
+
+UNREACHED_32 = np.iinfo(np.int32).max
+
+
+class Landmarks:
+    """
+    Lower bounds on the cost to a goal for the ALT heuristic (A*, Landmarks, Triangle inequality).
+
+    For a landmark L, the triangle inequality gives two lower bounds on the cost d(n, t) of the
+    shortest path from a cell n to the goal t:
+
+        d(L, t) - d(L, n)   and   d(n, L) - d(t, L)
+
+    The heuristic of a cell is the largest of these bounds over all landmarks (and 0). Every bound
+    is consistent, so the heuristic never overestimates and A* can still close nodes for good.
+    Where walls force long detours it is much closer to the real cost than the Manhattan distance.
+
+    The landmarks are picked far apart: each is the cell farthest from the landmarks picked so far.
+    The costs to and from every landmark are found with Dijkstra and saved beside the map file
+    (`samfundet_1.landmarks.npz` for `samfundet_1.csv`), so later runs only have to load them.
+    They are only valid for the cell values the map had when they were computed.
+    """
+
+    def __init__(self, map: Samfundet, count=8, filename: str = None):
+        """
+        :param map: the map to find lower bounds for
+        :param count: number of landmarks
+        :param filename: where to save the distances, defaults to beside the map file. Maps that
+            were not read from a file are not saved unless a filename is given.
+        """
+        self.map = map
+        self.count = count
+        self.width = map.int_map.shape[1]
+        self.filename = filename if filename is not None else self.default_filename(map)
+        checksum = hashlib.sha1(np.ascontiguousarray(map.int_map).tobytes())
+        if map.connectivity != 4:
+            # the distances also depend on how the map is moved through
+            checksum.update(f'{map.connectivity} {map.corners}'.encode())
+        self.checksum = checksum.hexdigest()
+        if not self.load():
+            self.build()
+            self.save()
+
+    @staticmethod
+    def default_filename(map: Samfundet) -> str:
+        if map.path_to_map is None:
+            return None
+        return os.path.splitext(map.path_to_map)[0] + '.landmarks.npz'
+
+    def build(self):
+        """
+        Pick the landmarks and find the cost of the shortest path from and to each of them.
+        """
+        walkable = np.flatnonzero(np.asarray(self.map.int_map).ravel() != -1)
+        # Cost from the closest landmark to every cell, the next landmark is the cell farthest away.
+        # The first one is the cell farthest from an arbitrary cell, which tends to be a corner.
+        closest = dijkstra(self.map, [self.to_pos(walkable[0])])
+        landmarks, forward, backward = [], [], []
+        for _ in range(self.count):
+            reachable = closest[walkable] != UNREACHED
+            if not reachable.any():
+                break
+            distances = closest[walkable]
+            landmark = int(walkable[reachable][np.argmax(distances[reachable])])
+            if closest[landmark] == 0 and landmarks:
+                break  # every reachable cell is a landmark already
+
+            from_landmark = dijkstra(self.map, [self.to_pos(landmark)])
+            to_landmark = dijkstra(self.map, [self.to_pos(landmark)], reverse=True)
+            landmarks.append(landmark)
+            forward.append(np.minimum(from_landmark, UNREACHED_32).astype(np.int32))
+            backward.append(np.minimum(to_landmark, UNREACHED_32).astype(np.int32))
+
+            if len(landmarks) == 1:
+                closest = from_landmark
+            else:
+                np.minimum(closest, from_landmark, out=closest)
+
+        self.landmarks = np.array(landmarks, dtype=np.int64)
+        size = self.map.int_map.size
+        self.forward = np.array(forward, dtype=np.int32).reshape(len(landmarks), size)
+        self.backward = np.array(backward, dtype=np.int32).reshape(len(landmarks), size)
+
+    def save(self):
+        if self.filename is None:
+            return
+        np.savez(self.filename, checksum=self.checksum, landmarks=self.landmarks,
+                 forward=self.forward, backward=self.backward)
+
+    def load(self) -> bool:
+        """
+        Load the saved distances, unless they are missing, for another number of landmarks,
+        or for a map with other cell values.
+        :return: whether the distances were loaded
+        """
+        if self.filename is None or not os.path.exists(self.filename):
+            return False
+        with np.load(self.filename) as data:
+            if str(data['checksum']) != self.checksum or len(data['landmarks']) != self.count:
+                return False
+            self.landmarks = data['landmarks']
+            self.forward = data['forward']
+            self.backward = data['backward']
+        return True
+
+    def to_pos(self, index: int) -> 'tuple[int, int]':
+        return divmod(int(index), self.width)
+
+    def get_positions(self) -> 'list[tuple[int, int]]':
+        return [self.to_pos(landmark) for landmark in self.landmarks]
+
+    def field(self, goal_pos) -> np.ndarray:
+        """
+        Get the lower bound on the cost from every cell to the goal.
+        :return: flat array indexed by `x * width + y`
+        """
+        goal = goal_pos[0] * self.width + goal_pos[1]
+        # Unreachable costs are large, but the differences stay valid lower bounds: a cell that
+        # a landmark reaches while it does not reach the goal can not reach the goal either.
+        from_landmarks = self.forward[:, goal, np.newaxis].astype(np.int64) - self.forward
+        to_landmarks = self.backward - self.backward[:, goal, np.newaxis].astype(np.int64)
+        bounds = np.maximum(from_landmarks, to_landmarks).max(axis=0, initial=0)
+        return bounds
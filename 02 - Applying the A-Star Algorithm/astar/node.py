@@ -2,20 +2,42 @@ from astar.state import State
 
 
 class Node:
+    """
+    Uses __slots__ instead of a __dict__ to keep every node small, since a search
+    creates one node for every cell it reaches.
+    """
+
+    __slots__ = ('state', 'parent', '_g', '_h', 'f')
 
     def __init__(self, state: State):
         self.state: State = state  # Coordinate (x, y)
 
         self.parent: Node = None  # best parent
 
-        self.g = 0  # cost from start to this node
-        self.h = 0  # estimated cost from this node to the goal
+        self._g = 0  # cost from start to this node
+        self._h = 0  # estimated cost from this node to the goal
+
+        # Estimated total distance from start node to goal through this node,
+        # kept up to date whenever g or h changes.
+        self.f = 0
+
+    @property
+    def g(self):
+        return self._g
+
+    @g.setter
+    def g(self, value):
+        self._g = value
+        self.f = value + self._h
 
-    def f(self):
-        """
-        Estimated total distance from start node to goal through this node.
-        """
-        return self.g + self.h
+    @property
+    def h(self):
+        return self._h
+
+    @h.setter
+    def h(self, value):
+        self._h = value
+        self.f = self._g + value
 
     def __eq__(self, other: any):
         return self.state == other.state
@@ -23,6 +45,12 @@ class Node:
     def __ne__(self, other: any):
         return not self.__eq__(other)
 
+    def __lt__(self, other: 'Node'):
+        return self.f < other.f
+
+    def __hash__(self):
+        return hash(self.state)
+
     def __str__(self):
         return str(self.state)
 
@@ -0,0 +1,184 @@
+import multiprocessing
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from environment.adjacency import DIRECTIONS
+from astar.array_astar import UNREACHED
+
+# Marks both a missing path in the distance table and a missing next hop
+NONE = np.iinfo(np.uint16).max
+# Distance used while relaxing, small enough that adding a cell value can not overflow
+INFINITY = np.iinfo(np.int32).max // 2
+
+# Set in every worker process by init_worker
+worker_grid: dict = None
+
+
+def init_worker(values: np.ndarray, cells: np.ndarray, neighbours: np.ndarray):
+    """
+    Runs once in every worker, and keeps what `build_rows` needs so it is not sent with every chunk.
+    :param values: the integer map padded with a border of walls
+    :param cells: flat (unpadded) index of every passable cell
+    :param neighbours: table index of the neighbour of every passable cell in every direction
+    """
+    global worker_grid
+    walls = values == -1
+    worker_grid = {
+        'walls': walls[1:-1, 1:-1],
+        # cost of moving into every cell, walls can never be entered
+        'step': np.where(walls, INFINITY, values.astype(np.int32)),
+        'cells': cells,
+        'neighbours': neighbours,
+    }
+
+
+def build_rows(targets: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+    """
+    Find the cost from every passable cell to each of the targets, and the neighbour to move to
+    next on the way there.
+
+    Instead of one Dijkstra search per target, the distances to all targets are relaxed at once:
+    every round, each cell takes the cheapest of moving to a neighbour and continuing from there,
+    as whole array operations on the map shifted one cell in each direction. This repeats until
+    nothing improves, which takes as many rounds as the longest shortest path has steps.
+    :param targets: table indices of the targets
+    :return: the distance and next hop table rows of the targets
+    """
+    walls, step = worker_grid['walls'], worker_grid['step']
+    cells, neighbours = worker_grid['cells'], worker_grid['neighbours']
+    height, width = walls.shape
+    rows = np.arange(len(targets))
+
+    distances = np.full((len(targets), height + 2, width + 2), INFINITY, dtype=np.int32)
+    x, y = np.divmod(cells[targets], width)
+    distances[rows, x + 1, y + 1] = 0
+    inner = distances[:, 1:-1, 1:-1]
+    while True:
+        # cost of moving into each cell and continuing from there
+        through = distances + step
+        best = np.minimum(np.minimum(through[:, 1:-1, 2:], through[:, 1:-1, :-2]),
+                          np.minimum(through[:, 2:, 1:-1], through[:, :-2, 1:-1]))
+        best[:, walls] = INFINITY
+        improved = best < inner
+        if not improved.any():
+            break
+        np.minimum(inner, best, out=inner)
+
+    # The next hop is the neighbour the best distance came from, ties go to the first direction
+    through = distances + step
+    options = np.stack([through[:, 1 + dx:1 + dx + height, 1 + dy:1 + dy + width]
+                        for dx, dy in DIRECTIONS]).reshape(len(DIRECTIONS), len(targets), -1)[:, :, cells]
+    direction = options.argmin(axis=0)
+    next_hops = neighbours[np.arange(len(cells)), direction]
+
+    row_distances = inner.reshape(len(targets), -1)[:, cells]
+    if (row_distances[row_distances != INFINITY] >= NONE).any():
+        raise ValueError('distances are too large to be stored as uint16')
+    unreachable = row_distances == INFINITY
+    next_hops[unreachable] = NONE
+    next_hops[rows, targets] = NONE
+    row_distances[unreachable] = NONE
+    return row_distances.astype(np.uint16), next_hops.astype(np.uint16)
+
+
+class DistanceOracle:
+    """
+    All-pairs shortest path table for small maps, answering queries by lookup instead of searching.
+
+    Only passable cells get a place in the table. `distances[t, s]` is the cost of the shortest path
+    from cell s to cell t, and `next_hops[t, s]` the cell to move to from s on the way to t, so a
+    path is found by following next hops along a single row. Both tables are uint16, which limits
+    the map to fewer than 65535 passable cells and paths cheaper than 65535; with a few thousand
+    passable cells, the tables take a few tens of MB.
+
+    The rows are built in chunks of targets by a pool of worker processes (see `build_rows`).
+    The table is for the cell values the map had when it was built.
+    """
+
+    def __init__(self, map: Samfundet, processes: int = None, chunksize=32):
+        """
+        :param processes: number of worker processes used to build the table, defaults to the
+            number of cores. With 1, the table is built in this process.
+        :param chunksize: number of targets every worker relaxes at once
+        """
+        if map.connectivity != 4:
+            raise ValueError('DistanceOracle only supports maps without diagonal moves')
+        self.map = map
+        int_map = np.asarray(map.int_map)
+        height, self.width = int_map.shape
+        self.cells = np.flatnonzero(int_map.ravel() != -1)
+        if len(self.cells) >= NONE:
+            raise ValueError(f'{len(self.cells)} passable cells do not fit in a uint16 table')
+
+        # table index of every cell, NONE for walls
+        self.index = np.full(int_map.size, NONE, dtype=np.int64)
+        self.index[self.cells] = np.arange(len(self.cells))
+        padded_index = np.pad(self.index.reshape(height, self.width), 1, constant_values=NONE)
+        x, y = np.divmod(self.cells, self.width)
+        neighbours = np.stack([padded_index[x + 1 + dx, y + 1 + dy] for dx, dy in DIRECTIONS], axis=1)
+
+        size = len(self.cells)
+        self.distances = np.empty((size, size), dtype=np.uint16)
+        self.next_hops = np.empty((size, size), dtype=np.uint16)
+        self.build(np.pad(int_map, 1, constant_values=-1), neighbours, processes, chunksize)
+
+    def build(self, values: np.ndarray, neighbours: np.ndarray, processes: int, chunksize: int):
+        chunks = [np.arange(start, min(start + chunksize, len(self.cells)))
+                  for start in range(0, len(self.cells), chunksize)]
+        initargs = (values, self.cells, neighbours)
+        if processes == 1:
+            init_worker(*initargs)
+            results = map(build_rows, chunks)
+            self.store(chunks, results)
+        else:
+            with multiprocessing.Pool(processes, initializer=init_worker, initargs=initargs) as pool:
+                self.store(chunks, pool.imap(build_rows, chunks))
+
+    def store(self, chunks: 'list[np.ndarray]', results: 'Iterable[tuple[np.ndarray, np.ndarray]]'):
+        for targets, (distances, next_hops) in zip(chunks, results):
+            self.distances[targets] = distances
+            self.next_hops[targets] = next_hops
+
+    def to_pos(self, cell: int) -> 'tuple[int, int]':
+        return divmod(int(self.cells[cell]), self.width)
+
+    def query(self, start_pos, goal_pos) -> 'tuple[list[tuple[int, int]], int]':
+        """
+        Look up the shortest path between two positions on the map, in time proportional to its length.
+        :return: the path (empty if there is none) and its cost (None if there is no path)
+        """
+        source = self.index[start_pos[0] * self.width + start_pos[1]]
+        target = self.index[goal_pos[0] * self.width + goal_pos[1]]
+        if source == NONE or target == NONE or self.distances[target, source] == NONE:
+            return [], None
+
+        next_hops = memoryview(self.next_hops[target])
+        cell = int(source)
+        path = [self.to_pos(cell)]
+        while cell != target:
+            cell = next_hops[cell]
+            path.append(self.to_pos(cell))
+        return path, int(self.distances[target, source])
+
+    def queries(self, pairs: 'Iterable[tuple]') -> 'Iterator[tuple[list[tuple[int, int]], int]]':
+        """
+        Answer a stream of (start_pos, goal_pos) queries, yielding the path and cost of each
+        query in the same order as they were given.
+        """
+        for start_pos, goal_pos in pairs:
+            yield self.query(start_pos, goal_pos)
+
+    def field(self, goal_pos) -> np.ndarray:
+        """
+        Get the exact cost from every cell to the goal, UNREACHED where there is no path. Can be
+        used as `lower_bounds` for the search engines, which then only expand the path itself.
+        :return: flat array indexed by `x * width + y`
+        """
+        field = np.full(self.index.size, UNREACHED, dtype=np.int64)
+        target = self.index[goal_pos[0] * self.width + goal_pos[1]]
+        if target != NONE:
+            row = self.distances[target]
+            field[self.cells] = np.where(row == NONE, UNREACHED, row)
+        return field
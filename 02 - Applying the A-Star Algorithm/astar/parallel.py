@@ -0,0 +1,80 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from astar.array_astar import ArrayAstar
+from astar.batch import PathService
+from astar.path_finder import PathFinder
+
+# Set in every worker process by init_worker
+worker_memory: shared_memory.SharedMemory = None
+worker_service: PathService = None
+
+
+def init_worker(memory_name: str, shape, dtype, start_pos, goal_pos, connectivity: int, corners: str,
+                engine: 'type[PathFinder]'):
+    """
+    Runs once in every worker, attaches to the shared integer map (without copying it)
+    and creates the workers own `PathService` on top of it, moving the same way as the map.
+    """
+    global worker_memory, worker_service
+    worker_memory = shared_memory.SharedMemory(name=memory_name)
+    int_map = np.ndarray(shape, dtype=dtype, buffer=worker_memory.buf)
+    map = Samfundet.from_array(int_map, start_pos, goal_pos)
+    map.set_movement(connectivity, corners)
+    worker_service = PathService(map, engine)
+
+
+def answer_query(query: tuple) -> 'tuple[list[tuple[int, int]], int]':
+    start_pos, goal_pos = query
+    return worker_service.query(start_pos, goal_pos)
+
+
+class ParallelPathService:
+    """
+    Answers (start, goal) queries on a single map using a pool of worker processes.
+
+    The integer map is copied once into shared memory, which every worker attaches to when
+    it starts, so the map is never pickled together with the queries. Queries are sent to
+    the workers in chunks and the results are returned in the same order as the queries,
+    so the output does not depend on the number of processes.
+    Use as a context manager, or call `close` when done, to stop the workers and free the memory.
+    """
+
+    def __init__(self, map: Samfundet, processes: int = None,
+                 engine: 'type[PathFinder]' = ArrayAstar, chunksize=64):
+        self.chunksize = chunksize
+        self.memory = shared_memory.SharedMemory(create=True, size=map.int_map.nbytes)
+        int_map = np.ndarray(map.int_map.shape, dtype=map.int_map.dtype, buffer=self.memory.buf)
+        int_map[:] = map.int_map
+
+        self.pool = multiprocessing.Pool(
+            processes,
+            initializer=init_worker,
+            initargs=(self.memory.name, int_map.shape, int_map.dtype,
+                      map.get_start_pos(), map.get_goal_pos(), map.connectivity, map.corners, engine))
+
+    def queries(self, pairs: 'Iterable[tuple]') -> 'Iterator[tuple[list[tuple[int, int]], int]]':
+        """
+        Answer a stream of (start_pos, goal_pos) queries, yielding the path and cost of each
+        query in the same order as they were given.
+        """
+        return self.pool.imap(answer_query, pairs, self.chunksize)
+
+    def close(self):
+        """
+        Stop the worker processes and release the shared memory.
+        """
+        self.pool.terminate()
+        self.pool.join()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> 'ParallelPathService':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,85 @@
+from abc import abstractmethod
+
+from environment.Samfundet import Samfundet
+
+
+class PathFinder:
+    """
+    Common interface for the different path finding engines. Every engine searches a
+    `Samfundet` map from its start_pos to its goal_pos (or the positions given to the engine),
+    and can then report and draw the path.
+    """
+
+    def __init__(self, map: Samfundet):
+        self.map = map
+        # a SearchProfiler, for the engines that report their operations to one
+        self.profiler = None
+        self.start_pos = map.get_start_pos()
+        self.goal_pos = map.get_goal_pos()
+
+    def reset(self, start_pos=None, goal_pos=None):
+        """
+        Prepare a new search between the given positions (defaults to the maps start_pos and
+        goal_pos). Engines reuse what they can from earlier searches on the same map.
+        """
+        self.start_pos = start_pos if start_pos is not None else self.map.get_start_pos()
+        self.goal_pos = goal_pos if goal_pos is not None else self.map.get_goal_pos()
+
+    def find_path(self):
+        """
+        Find the shortest path from the maps given start_pos to its goal_pos.
+        """
+        self.agenda_loop()
+        if self.get_cost() is None:
+            print("Could not find any path from start to end")
+        print(f'Found path after checking {self.get_expanded()} nodes')
+        if self.profiler is not None:
+            print(self.profiler.summary())
+
+    @abstractmethod
+    def agenda_loop(self):
+        """
+        The main loop of the search, stops when the shortest path to the goal is found.
+        Prints nothing, if there is no path `get_cost` returns None.
+        """
+
+    @abstractmethod
+    def get_path(self) -> 'list[tuple[int, int]]':
+        """
+        Get the positions of the shortest path, from the start to the goal (both included).
+        The list is empty if no path was found.
+        """
+
+    @abstractmethod
+    def get_cost(self) -> int:
+        """
+        Get the total cost of the shortest path (the start cell is free), or None if no path was found.
+        With diagonal moves the cost is not a whole number, see `Adjacency.to_cost`.
+        """
+
+    @abstractmethod
+    def get_expanded(self) -> int:
+        """
+        Get the number of nodes that were expanded while searching.
+        """
+
+    def set_path_map_values(self, value: str):
+        """
+        Overwrite the map string values (used to draw the map) to empty
+        space in order to be able to draw the map with the path easily.
+        """
+        for pos in self.get_path()[1:-1]:  # skip start and goal position
+            self.map.set_cell_value(pos, value)
+
+    def visualize_path(self, show=True, save=True, filename: str = 'solved.png', writer=None):
+        """
+        Saves the path to the map object and shows it in an image and/or saves it
+        with the given filename. If an ImageWriter is given, the images are shown
+        and saved in the background.
+        """
+        self.set_path_map_values(" ")
+        if(show):
+            self.map.show_map(writer)
+        if(save):
+            self.map.save_map(filename, writer)
+        self.set_path_map_values(' . ')
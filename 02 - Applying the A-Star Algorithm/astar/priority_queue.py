@@ -0,0 +1,98 @@
+class PriorityQueue:
+    """
+    Binary min-heap where every item is stored together with a key. The queue keeps
+    track of where each key is located in the heap, which lets us look up, and change
+    the priority of, an item that is already queued in O(log n).
+    """
+
+    def __init__(self):
+        self.heap: list[list] = []  # entries on the form [priority, key, item]
+        self.positions: dict = {}  # key -> index of its entry in self.heap
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __bool__(self) -> bool:
+        return len(self.heap) > 0
+
+    def __contains__(self, key) -> bool:
+        return key in self.positions
+
+    def get(self, key):
+        """
+        Get the item stored with the given key.
+        """
+        return self.heap[self.positions[key]][2]
+
+    def push(self, key, item, priority):
+        """
+        Add a new item to the queue.
+        """
+        self.heap.append([priority, key, item])
+        self.positions[key] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+        """
+        entry = self.heap[0]
+        last = self.heap.pop()
+        del self.positions[entry[1]]
+        if self.heap:
+            self.heap[0] = last
+            self.positions[last[1]] = 0
+            self.sift_down(0)
+        return entry[2]
+
+    def update(self, key, priority):
+        """
+        Change the priority of an item already in the queue, both lowering
+        (decrease-key) and raising the priority is supported.
+        """
+        index = self.positions[key]
+        old_priority = self.heap[index][0]
+        self.heap[index][0] = priority
+        if priority < old_priority:
+            self.sift_up(index)
+        else:
+            self.sift_down(index)
+
+    def sift_up(self, index: int):
+        """
+        Move the entry at `index` towards the root until its parent is cheaper.
+        """
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if entry[0] < heap[parent][0]:
+                heap[index] = heap[parent]
+                self.positions[heap[index][1]] = index
+                index = parent
+            else:
+                break
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+    def sift_down(self, index: int):
+        """
+        Move the entry at `index` towards the leaves until both children are more expensive.
+        """
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if heap[child][0] < entry[0]:
+                heap[index] = heap[child]
+                self.positions[heap[index][1]] = index
+                index = child
+            else:
+                break
+        heap[index] = entry
+        self.positions[entry[1]] = index
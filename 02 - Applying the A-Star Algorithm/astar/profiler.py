@@ -0,0 +1,94 @@
+import csv
+import json
+import time
+
+# Operations reported by the search, in the order they happen during an expansion
+EVENTS = ['pop', 'neighbours', 'heuristic', 'push', 'decrease_key', 'requeue', 'reopen']
+
+
+class SearchProfiler:
+    """
+    Counts the operations of a search, and the time spent on each of them.
+
+    The search calls `mark` after every operation (see EVENTS), which counts it and adds the time
+    since the previous mark to it, so the time of the bookkeeping in between (like checking if a
+    node is closed) goes to the operation that follows it. Time after the last mark of a search is
+    reported as 'other'. The counts and times add up over every search the profiler is given to.
+
+    - pop: a node is taken from the open list and closed
+    - neighbours: the children of a node are generated, counted once per child
+    - heuristic: the heuristic of a newly seen node is computed
+    - push: a newly seen node is added to the open list
+    - decrease_key: a cheaper path to an open node is found, and it is moved in the open list
+    - requeue: an open node is reached again without a cheaper path, and is only moved behind
+      the nodes with the same f value
+    - reopen: a cheaper path to a node that was already expanded is found (only in `Astar.anytime`)
+
+    Override `mark` (and call it from the override) to follow the individual nodes.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self.seconds = dict.fromkeys(EVENTS + ['other'], 0.0)
+        self.searches = 0
+        self.total = 0.0
+        self.started = None
+        self.last = None
+
+    def begin(self):
+        """
+        Called when a search starts.
+        """
+        self.searches += 1
+        self.started = self.last = time.perf_counter()
+
+    def mark(self, event: str, node=None, count=1):
+        """
+        Called after every operation of the search.
+        :param event: the operation, one of EVENTS
+        :param node: the node the operation was done on
+        :param count: how many operations it was, like the number of neighbours generated
+        """
+        now = time.perf_counter()
+        self.counts[event] += count
+        self.seconds[event] += now - self.last
+        self.last = now
+
+    def end(self):
+        """
+        Called when a search stops, with or without finding a path.
+        """
+        now = time.perf_counter()
+        self.seconds['other'] += now - self.last
+        self.total += now - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            'searches': self.searches,
+            'total_seconds': self.total,
+            'events': {event: {'count': self.counts.get(event, 0), 'seconds': seconds}
+                       for event, seconds in self.seconds.items()},
+        }
+
+    def save(self, filename: str):
+        """
+        Save the counts and times, as JSON or as CSV (one row per event) depending on the filename.
+        """
+        with open(filename, 'w', newline='') as file:
+            if filename.endswith('.csv'):
+                writer = csv.writer(file)
+                writer.writerow(['event', 'count', 'seconds', 'share'])
+                for event, seconds in self.seconds.items():
+                    writer.writerow([event, self.counts.get(event, 0), seconds, seconds / self.total if self.total else 0])
+            else:
+                json.dump(self.to_dict(), file, indent=1)
+
+    def summary(self) -> str:
+        """
+        A table of the counts and times, for printing.
+        """
+        lines = [f'{self.searches} search(es) in {self.total * 1000:.1f}ms']
+        for event, seconds in self.seconds.items():
+            share = seconds / self.total if self.total else 0
+            lines.append(f'{event:>14} {self.counts.get(event, ""):>9} {seconds * 1000:>9.1f}ms {share:>6.1%}')
+        return '\n'.join(lines)
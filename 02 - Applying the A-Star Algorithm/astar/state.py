@@ -1,11 +1,21 @@
 class State:
     """
-    In this environment the state only conists of the x and y coordinate
+    In this environment the state only conists of the x and y coordinate.
+    States are immutable and hashable, so they can be used as keys in sets and dicts.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('State is immutable')
+
+    def __reduce__(self):
+        # copy and pickle would otherwise set the slots through __setattr__
+        return State, (self.x, self.y)
 
     def __eq__(self, other) -> bool:
         return other.x == self.x and other.y == self.y
@@ -13,6 +23,9 @@ class State:
     def __ne__(self, other) -> bool:
         return not self.__eq__(other)
 
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
     def __str__(self) -> str:
         return f'({self.x}, {self.y})'
 
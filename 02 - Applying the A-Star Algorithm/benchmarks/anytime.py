@@ -0,0 +1,34 @@
+"""
+Compare weighted A* (f = g + w * h) with optimal A* on tasks 1-4 and a larger generated map,
+and show how `Astar.anytime` (ARA*) improves its path and bound over time.
+
+Run from the assignment folder with `python -m benchmarks.anytime`
+"""
+import time
+
+from astar.astar import Astar
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+
+
+if __name__ == "__main__":
+    maps = [(f'task {task}', Samfundet(task=task)) for task in [1, 2, 3, 4]]
+    maps.append(('weighted 300x300', random_map(300, 300, wall_ratio=0.2, max_cost=3, seed=1)))
+
+    print(f'{"map":>17} {"weight":>7} {"cost":>6} {"expanded":>9} {"time":>9}')
+    for name, map in maps:
+        for weight in [1, 1.5, 3]:
+            start = time.perf_counter()
+            search = Astar(map, weight=weight)
+            search.agenda_loop()
+            seconds = time.perf_counter() - start
+            print(f'{name:>17} {weight:>7} {search.get_cost():>6} {search.get_expanded():>9} {seconds * 1000:>7.1f}ms')
+
+    print()
+    print(f'{"map":>17} {"ARA*":>7} {"cost":>6} {"expanded":>9} {"time":>9} {"bound":>6}   (weight 3, 0.5s budget)')
+    for name, map in maps:
+        start = time.perf_counter()
+        search = Astar(map)
+        for number, (path, cost, bound) in enumerate(search.anytime(weight=3, time_budget=0.5), 1):
+            seconds = time.perf_counter() - start
+            print(f'{name:>17} {number:>7} {cost:>6} {search.get_expanded():>9} {seconds * 1000:>7.1f}ms {bound:>6.3f}')
@@ -0,0 +1,56 @@
+"""
+Measure the throughput (queries per second) of answering random (start, goal) queries on
+one of the task maps, loading the map for every query like `main.py` does, compared to
+loading it once and answering every query with a `PathService`.
+
+Run from the assignment folder with `python -m benchmarks.batch`
+"""
+import time
+
+import numpy as np
+
+from astar.astar import Astar
+from astar.array_astar import ArrayAstar
+from astar.batch import PathService
+from environment.Samfundet import Samfundet
+
+
+def random_queries(map: Samfundet, count: int, seed=0) -> 'list[tuple]':
+    """
+    Pick `count` random (start, goal) pairs among the passable cells of the map.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.argwhere(map.int_map != -1)
+    starts = cells[rng.integers(len(cells), size=count)]
+    goals = cells[rng.integers(len(cells), size=count)]
+    return [(tuple(start), tuple(goal)) for start, goal in zip(starts.tolist(), goals.tolist())]
+
+
+def reload_every_query(queries) -> list:
+    results = []
+    for start_pos, goal_pos in queries:
+        astar = Astar(Samfundet(task=1), start_pos, goal_pos)
+        astar.agenda_loop()
+        results.append(astar.get_cost())
+    return results
+
+
+def service(queries, engine) -> list:
+    return [cost for _, cost in PathService(Samfundet(task=1), engine).queries(queries)]
+
+
+if __name__ == "__main__":
+    queries = random_queries(Samfundet(task=1), 1000)
+    runs = [
+        ('new map and Astar per query', lambda: reload_every_query(queries)),
+        ('PathService with Astar', lambda: service(queries, Astar)),
+        ('PathService with ArrayAstar', lambda: service(queries, ArrayAstar)),
+    ]
+    expected = None
+    for name, run in runs:
+        start = time.perf_counter()
+        costs = run()
+        seconds = time.perf_counter() - start
+        expected = expected or costs
+        assert costs == expected
+        print(f'{name:<30} {len(queries) / seconds:8.0f} queries/s')
@@ -0,0 +1,42 @@
+"""
+Compare the number of expanded nodes of `BidirectionalAstar` with `Astar` on the
+task maps and on random queries on a larger generated map.
+
+Run from the assignment folder with `python -m benchmarks.bidirectional`
+"""
+from astar.array_astar import ArrayAstar
+from astar.astar import Astar
+from astar.bidirectional import BidirectionalAstar, FORWARD, BACKWARD
+from benchmarks.batch import random_queries
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+
+
+if __name__ == "__main__":
+    print(f'{"map":>12} {"cost":>6} {"Astar":>8} {"bidirectional":>14} {"forward":>8} {"backward":>9}')
+    for task in [1, 2, 3, 4]:
+        map = Samfundet(task=task)
+        astar = Astar(map)
+        astar.agenda_loop()
+        bidirectional = BidirectionalAstar(map)
+        bidirectional.agenda_loop()
+        assert astar.get_cost() == bidirectional.get_cost()
+        print(f'{f"task {task}":>12} {astar.get_cost():>6} {astar.get_expanded():>8} '
+              f'{bidirectional.get_expanded():>14} {bidirectional.expanded[FORWARD]:>8} '
+              f'{bidirectional.expanded[BACKWARD]:>9}')
+
+    map = random_map(300, 300, wall_ratio=0.1, max_cost=4, seed=0)
+    astar = ArrayAstar(map)
+    bidirectional = BidirectionalAstar(map)
+    totals = [0, 0, 0, 0]
+    for start_pos, goal_pos in random_queries(map, 50):
+        astar.reset(start_pos, goal_pos)
+        astar.agenda_loop()
+        bidirectional.reset(start_pos, goal_pos)
+        bidirectional.agenda_loop()
+        assert astar.get_cost() == bidirectional.get_cost()
+        totals[0] += astar.get_expanded()
+        totals[1] += bidirectional.get_expanded()
+        totals[2] += bidirectional.expanded[FORWARD]
+        totals[3] += bidirectional.expanded[BACKWARD]
+    print(f'{"300x300 x50":>12} {"":>6} {totals[0]:>8} {totals[1]:>14} {totals[2]:>8} {totals[3]:>9}')
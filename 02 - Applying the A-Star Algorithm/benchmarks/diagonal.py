@@ -0,0 +1,34 @@
+"""
+Compare moving only straight (4-connected) with also moving diagonally (8-connected, with each
+rule for passing walls) on tasks 1-4 and larger generated maps: the path cost, the number of
+cells on the path and the nodes expanded by `ArrayAstar` and `BidirectionalAstar`.
+
+Run from the assignment folder with `python -m benchmarks.diagonal`
+"""
+import time
+
+from astar.array_astar import ArrayAstar
+from astar.bidirectional import BidirectionalAstar
+from environment.Samfundet import Samfundet
+from environment.generator import halls_map, terrain_map
+
+
+if __name__ == "__main__":
+    maps = [(f'task {task}', Samfundet(task=task)) for task in [1, 2, 3, 4]]
+    maps += [('halls 500x500', halls_map(500, 500, max_cost=2)), ('terrain 500x500', terrain_map(500, 500))]
+    movements = [(4, 'never'), (8, 'never'), (8, 'one'), (8, 'always')]
+
+    print(f'{"map":>16} {"moves":>10} {"cost":>8} {"cells":>6} {"ArrayAstar":>20} {"BidirectionalAstar":>20}')
+    for name, map in maps:
+        for connectivity, corners in movements:
+            map.set_movement(connectivity, corners)
+            columns = []
+            for engine in [ArrayAstar, BidirectionalAstar]:
+                start = time.perf_counter()
+                search = engine(map)
+                search.agenda_loop()
+                seconds = time.perf_counter() - start
+                columns.append(f'{search.get_expanded():>9} {seconds * 1000:>8.1f}ms')
+            moves = '4' if connectivity == 4 else f'8, {corners}'
+            print(f'{name:>16} {moves:>10} {search.get_cost():>8.2f} {len(search.get_path()):>6} {" ".join(columns)}')
+        map.set_movement()
@@ -0,0 +1,85 @@
+"""
+Serve path queries to one goal from its distance field with `DistanceFieldService`, compared to
+searching every query with `ArrayAstar`. Then follow the moving goal of task 5 and of a larger
+generated map, comparing the time to repair the field with the time to find it from scratch.
+
+Run from the assignment folder with `python -m benchmarks.distance_service`
+"""
+import time
+
+import numpy as np
+
+from astar.array_astar import ArrayAstar
+from astar.dijkstra import dijkstra
+from astar.distance_service import DistanceFieldService
+from environment.Samfundet import Samfundet
+from environment.generator import halls_map, terrain_map
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def search_all(map, queries) -> 'list[int]':
+    search = ArrayAstar(map)
+    costs = []
+    for start_pos, goal_pos in queries:
+        search.reset(start_pos, goal_pos)
+        search.agenda_loop()
+        costs.append(search.get_cost())
+    return costs
+
+
+def serve_all(map, queries) -> 'list[int]':
+    service = DistanceFieldService(map)
+    return [cost for _, cost in service.queries(queries)]
+
+
+def follow(service, goals) -> 'tuple[float, float, float]':
+    """
+    Move the goal along the given positions, and time repairing the field against finding it
+    from scratch.
+    :return: the total time of both, and the average number of cells repaired per move
+    """
+    service.field(goals[0])
+    repair, scratch, refreshed = 0.0, 0.0, 0
+    for old_goal_pos, goal_pos in zip(goals, goals[1:]):
+        repair += timed(service.move_goal, old_goal_pos, goal_pos)[1]
+        refreshed += service.refreshed
+        field, seconds = timed(dijkstra, service.map, [goal_pos], True)
+        scratch += seconds
+        assert (service.field(goal_pos) == field).all()
+    return repair, scratch, refreshed / (len(goals) - 1)
+
+
+if __name__ == "__main__":
+    print(f'{"map":>17} {"queries":>8} {"ArrayAstar":>11} {"distance field":>15}')
+    for name, map in [('task 4', Samfundet(task=4)), ('halls 400x400', halls_map(400, 400, max_cost=2)),
+                      ('terrain 400x400', terrain_map(400, 400))]:
+        rng = np.random.default_rng(0)
+        cells = np.argwhere(np.asarray(map.int_map) != -1).tolist()
+        goal_pos = map.get_goal_pos()
+        queries = [(cells[i], goal_pos) for i in rng.choice(len(cells), size=200, replace=False)]
+        costs, search_seconds = timed(search_all, map, queries)
+        served, serve_seconds = timed(serve_all, map, queries)
+        assert costs == served
+        print(f'{name:>17} {len(queries):>8} {search_seconds:>10.2f}s {serve_seconds:>14.2f}s')
+
+    print()
+    print(f'{"moving goal":>17} {"moves":>6} {"repair":>10} {"scratch":>10} {"cells repaired":>15}   (per move)')
+    # the goal positions of task 5, as `tick` moves it
+    map = Samfundet(task=5)
+    goals = [list(map.get_goal_pos())]
+    while map.get_goal_pos() != map.get_end_goal_pos():
+        if map.tick() != goals[-1]:
+            goals.append(list(map.get_goal_pos()))
+    moving = [('task 5', Samfundet(task=5), goals)]
+    # along a pass through the terrain, which is never a wall
+    moving.append(('terrain 400x400', terrain_map(400, 400), [[385, y] for y in range(390, 350, -1)]))
+    for name, map, goals in moving:
+        repair, scratch, refreshed = follow(DistanceFieldService(map), goals)
+        moves = len(goals) - 1
+        print(f'{name:>17} {moves:>6} {repair / moves * 1000:>8.2f}ms {scratch / moves * 1000:>8.2f}ms '
+              f'{refreshed:>9.0f} of {np.count_nonzero(np.asarray(map.int_map) != -1)}')
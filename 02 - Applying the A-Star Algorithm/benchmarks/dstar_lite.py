@@ -0,0 +1,25 @@
+"""
+Follow the moving goal of task 5 with `DStarLite`, and report for every tick how many nodes
+were expanded to repair the path, compared to planning from scratch with `ArrayAstar`.
+
+Run from the assignment folder with `python -m benchmarks.dstar_lite`
+"""
+from astar.dstar_lite import DStarLite
+from environment.Samfundet import Samfundet
+
+
+if __name__ == "__main__":
+    map = Samfundet(task=5)
+    planner = DStarLite(map)
+    planner.find_path()
+
+    print(f'{"tick":>5} {"goal":>9} {"cost":>5} {"expanded":>9} {"from scratch":>13} {"saved":>6}')
+    while map.get_goal_pos() != map.get_end_goal_pos():
+        summary = planner.tick()
+        print(f'{summary["tick"]:>5} {str(summary["goal_pos"]):>9} {str(summary["cost"]):>5} '
+              f'{summary["expanded"]:>9} {summary["full_replanning_expanded"]:>13} {summary["saved"]:>6}')
+
+    incremental = sum(summary['expanded'] for summary in planner.ticks)
+    full = sum(summary['full_replanning_expanded'] for summary in planner.ticks)
+    print(f'{len(planner.ticks)} ticks, {incremental} nodes expanded incrementally, '
+          f'{full} when planning from scratch every tick')
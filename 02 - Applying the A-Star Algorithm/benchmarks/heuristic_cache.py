@@ -0,0 +1,46 @@
+"""
+Compare searches to a few shared goals (exits) with and without a `HeuristicCache`: with the
+Manhattan distance, and with the ALT heuristic (`Landmarks`) whose field is costly to compute
+for every search.
+
+Run from the assignment folder with `python -m benchmarks.heuristic_cache`
+"""
+import time
+
+import numpy as np
+
+from astar.array_astar import ArrayAstar
+from astar.astar import Astar
+from astar.heuristic_cache import HeuristicCache
+from astar.landmarks import Landmarks
+from environment.generator import halls_map
+
+
+def run(search, queries) -> 'tuple[list[int], float]':
+    costs = []
+    start = time.perf_counter()
+    for start_pos, goal_pos in queries:
+        search.reset(start_pos, goal_pos)
+        search.agenda_loop()
+        costs.append(search.get_cost())
+    return costs, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    map = halls_map(400, 400, max_cost=2, seed=0)
+    rng = np.random.default_rng(0)
+    cells = np.argwhere(np.asarray(map.int_map) != -1).tolist()
+    exits = [cells[i] for i in rng.choice(len(cells), size=4, replace=False)]
+    queries = [(cells[i], exits[i % len(exits)]) for i in rng.choice(len(cells), size=200, replace=False)]
+    landmarks = Landmarks(map)
+
+    print(f'{"engine":>10} {"heuristic":>10} {"uncached":>9} {"cached":>9} {"hits":>5}   '
+          f'({len(queries)} queries to {len(exits)} exits, halls 400x400)')
+    for engine, count in [(Astar, 40), (ArrayAstar, len(queries))]:
+        for name, lower_bounds in [('manhattan', None), ('landmarks', landmarks)]:
+            costs, seconds = run(engine(map, lower_bounds=lower_bounds), queries[:count])
+            cache = HeuristicCache(map, lower_bounds)
+            cached_costs, cached_seconds = run(engine(map, lower_bounds=cache), queries[:count])
+            assert costs == cached_costs
+            print(f'{engine.__name__:>10} {name:>10} {seconds:>8.2f}s {cached_seconds:>8.2f}s {cache.hits:>5}'
+                  + ('' if count == len(queries) else f'   (first {count} queries)'))
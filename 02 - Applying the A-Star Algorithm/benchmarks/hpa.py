@@ -0,0 +1,74 @@
+"""
+Compare `HierarchicalAstar` with `ArrayAstar` on large generated maps: time to build and to load
+the cluster graph, and the time, expanded nodes and path cost of long queries. Also times
+`ClusterGraph.update` after changing a few cells.
+
+Run from the assignment folder with `python -m benchmarks.hpa`
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from astar.array_astar import ArrayAstar
+from astar.hpa import ClusterGraph, HierarchicalAstar
+from environment.generator import random_map
+
+
+def run(search, queries) -> 'tuple[list[int], int, float]':
+    costs, expanded = [], 0
+    start = time.perf_counter()
+    for start_pos, goal_pos in queries:
+        search.reset(start_pos, goal_pos)
+        search.agenda_loop()
+        search.get_path()
+        costs.append(search.get_cost())
+        expanded += search.get_expanded()
+    return costs, expanded, time.perf_counter() - start
+
+
+def long_queries(map, count, seed=0) -> 'list[tuple[list[int], list[int]]]':
+    """
+    Random queries between the top left and bottom right quarters of the map.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = map.int_map.shape
+    open_cells = np.argwhere(np.asarray(map.int_map) != -1)
+    top_left = open_cells[(open_cells[:, 0] < height // 4) & (open_cells[:, 1] < width // 4)]
+    bottom_right = open_cells[(open_cells[:, 0] >= 3 * height // 4) & (open_cells[:, 1] >= 3 * width // 4)]
+    return [(top_left[rng.integers(len(top_left))].tolist(), bottom_right[rng.integers(len(bottom_right))].tolist())
+            for _ in range(count)]
+
+
+if __name__ == "__main__":
+    print(f'{"map":>10} {"build":>8} {"load":>8} {"engine":>18} {"expanded":>10} {"time":>9} {"cost":>7}   (20 queries)')
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [300, 600]:
+            map = random_map(size, size, wall_ratio=0.25, max_cost=2, seed=size)
+            filename = os.path.join(directory, f'{size}.hpa.npz')
+            start = time.perf_counter()
+            graph = ClusterGraph(map, cluster_size=10, filename=filename)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            graph = ClusterGraph(map, cluster_size=10, filename=filename)
+            load = time.perf_counter() - start
+
+            queries = long_queries(map, 20)
+            costs, expanded, seconds = run(ArrayAstar(map), queries)
+            hpa_costs, hpa_expanded, hpa_seconds = run(HierarchicalAstar(map, graph=graph), queries)
+            found = [(hpa, cost) for hpa, cost in zip(hpa_costs, costs) if cost is not None]
+            overhead = sum(hpa for hpa, _ in found) / sum(cost for _, cost in found) - 1
+
+            name = f'{size}x{size}'
+            print(f'{name:>10} {"":>8} {"":>8} {"ArrayAstar":>18} {expanded:>10} {seconds:>8.2f}s {"":>7}')
+            print(f'{name:>10} {build:>7.2f}s {load:>7.2f}s {"HierarchicalAstar":>18} {hpa_expanded:>10} '
+                  f'{hpa_seconds:>8.2f}s {overhead:>+6.1%}')
+
+            rng = np.random.default_rng(size)
+            cells = rng.integers(0, size, size=(10, 2)).tolist()
+            for x, y in cells:
+                map.set_cell_value((x, y), -1 if map.get_cell_value((x, y)) != -1 else 1, str_map=False)
+            start = time.perf_counter()
+            rebuilt = graph.update(cells)
+            print(f'{name:>10} changing 10 cells rebuilt {rebuilt} clusters in {time.perf_counter() - start:.3f}s')
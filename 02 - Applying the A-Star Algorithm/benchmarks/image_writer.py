@@ -0,0 +1,35 @@
+"""
+Measure exporting every step of a search as its own PNG, writing the images directly
+compared to handing them to an `ImageWriter`.
+
+Run from the assignment folder with `python -m benchmarks.image_writer`
+"""
+import os
+import tempfile
+import time
+
+from astar.astar import Astar
+from environment.generator import random_map
+from environment.image_writer import ImageWriter
+
+
+def export(search: Astar, directory: str, writer=None) -> float:
+    start = time.perf_counter()
+    search.visualize_all_steps(os.path.join(directory, '{:04d}.png'), skip=20, writer=writer)
+    if writer is not None:
+        writer.flush()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    search = Astar(random_map(80, 80, wall_ratio=0.2, max_cost=4, seed=0))
+    search.agenda_loop()
+    frames = -(-(search.get_expanded() - 2) // 20)
+    print(f'{frames} frames of {80 * 20}x{80 * 20} pixels')
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f'{"direct":>18} {export(search, directory):7.2f}s')
+        for workers in [1, 2, 4]:
+            with ImageWriter(workers=workers) as writer:
+                seconds = export(search, directory, writer)
+            print(f'{f"{workers} writer threads":>18} {seconds:7.2f}s')
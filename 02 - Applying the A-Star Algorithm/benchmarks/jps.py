@@ -0,0 +1,39 @@
+"""
+Compare `JumpPointSearch` with `Astar` and `ArrayAstar` on the tasks using samfundet_1.csv
+and on large generated open maps.
+
+Run from the assignment folder with `python -m benchmarks.jps`
+"""
+import time
+
+from astar.array_astar import ArrayAstar
+from astar.astar import Astar
+from astar.jps import JumpPointSearch
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+
+
+def run(engine, map) -> 'tuple[int, int, float]':
+    start = time.perf_counter()
+    search = engine(map)
+    search.agenda_loop()
+    return search.get_cost(), search.get_expanded(), time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    maps = [
+        ('task 1', Samfundet(task=1)),
+        ('task 2', Samfundet(task=2)),
+        ('open 600x600', random_map(600, 600, wall_ratio=0.0, seed=0)),
+        ('sparse 600x600', random_map(600, 600, wall_ratio=0.01, seed=0)),
+        ('scattered 300x300', random_map(300, 300, wall_ratio=0.05, seed=0)),
+        ('weighted 300x300', random_map(300, 300, wall_ratio=0.05, max_cost=4, seed=0)),
+    ]
+    print(f'{"map":>18} {"engine":>16} {"cost":>6} {"expanded":>9} {"time":>9}')
+    for name, map in maps:
+        costs = set()
+        for engine in [Astar, ArrayAstar, JumpPointSearch]:
+            cost, expanded, seconds = run(engine, map)
+            costs.add(cost)
+            print(f'{name:>18} {engine.__name__:>16} {cost:>6} {expanded:>9} {seconds:>8.3f}s')
+        assert len(costs) == 1
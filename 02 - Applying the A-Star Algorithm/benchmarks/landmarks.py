@@ -0,0 +1,54 @@
+"""
+Compare the ALT (landmark) heuristic with the Manhattan distance on tasks 1-4 and on a
+larger generated map, counting expanded nodes and timing every search end to end
+(computing the landmark lower bounds for the goal included).
+
+The landmark distances are computed on the first run and saved beside the csv files,
+later runs load them.
+
+Run from the assignment folder with `python -m benchmarks.landmarks`
+"""
+import time
+
+from astar.array_astar import ArrayAstar
+from astar.astar import Astar
+from astar.landmarks import Landmarks
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+from benchmarks.batch import random_queries
+
+
+def run(engine, map, queries, lower_bounds=None) -> 'tuple[int, float]':
+    """
+    :return: the total number of expanded nodes and the total time of the searches
+    """
+    search = engine(map, lower_bounds=lower_bounds)
+    expanded = 0
+    start = time.perf_counter()
+    for start_pos, goal_pos in queries:
+        search.reset(start_pos, goal_pos)
+        search.agenda_loop()
+        expanded += search.get_expanded()
+    return expanded, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    maps = [(f'task {task}', Samfundet(task=task)) for task in [1, 2, 3, 4]]
+    generated = random_map(200, 200, wall_ratio=0.3, max_cost=4, seed=0)
+    maps.append(('walls 200x200 (50 queries)', generated))
+
+    print(f'{"map":>27} {"engine":>11} {"landmarks":>10} {"manhattan":>21} {"alt":>21}')
+    for name, map in maps:
+        if map.task is not None:
+            queries = [(map.get_start_pos(), map.get_goal_pos())]
+        else:
+            queries = random_queries(map, 50)
+
+        start = time.perf_counter()
+        landmarks = Landmarks(map, count=8)
+        setup = time.perf_counter() - start
+        for engine in [Astar, ArrayAstar]:
+            expanded, seconds = run(engine, map, queries)
+            alt_expanded, alt_seconds = run(engine, map, queries, landmarks)
+            print(f'{name:>27} {engine.__name__:>11} {setup * 1000:>8.1f}ms '
+                  f'{expanded:>9} {seconds * 1000:>9.2f}ms {alt_expanded:>9} {alt_seconds * 1000:>9.2f}ms')
@@ -0,0 +1,49 @@
+"""
+Compare loading the task maps from the csv files (with pandas) and from binary map files,
+and time opening a large 10000x10000 map file.
+
+Run from the assignment folder with `python -m benchmarks.map_file`
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from environment.Samfundet import Samfundet
+from environment.map_file import convert_csv, load_map_file, save_map_file
+
+
+def timed(function, *args) -> 'tuple[object, float]':
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        print(f'{"map":>12} {"csv":>9} {"map file":>9}')
+        for task in [1, 2, 3, 4]:
+            csv_map = Samfundet(task=task)
+            filename = os.path.join(directory, f'task_{task}.map')
+            convert_csv(csv_map.path_to_map, filename,
+                        csv_map.get_start_pos(), csv_map.get_goal_pos(), csv_map.get_end_goal_pos())
+
+            _, csv_seconds = timed(csv_map.read_map, csv_map.path_to_map)
+            (int_map, *positions), file_seconds = timed(load_map_file, filename)
+            assert np.array_equal(int_map, csv_map.int_map)
+            assert positions == [csv_map.get_start_pos(), csv_map.get_goal_pos(), csv_map.get_end_goal_pos()]
+            print(f'{"task " + str(task):>12} {csv_seconds * 1000:>7.2f}ms {file_seconds * 1000:>7.2f}ms')
+
+        size = 10000
+        filename = os.path.join(directory, 'large.map')
+        large = np.ones((size, size), dtype=np.int8)
+        large[::7, ::3] = -1
+        save_map_file(filename, large, [0, 1], [size - 1, size - 1])
+        del large
+
+        (int_map, *_), seconds = timed(load_map_file, filename)
+        print(f'{size}x{size}: opened {os.path.getsize(filename) / 1e6:.0f} MB map file in {seconds * 1000:.2f}ms')
+        _, seconds = timed(np.count_nonzero, int_map == -1)
+        print(f'{size}x{size}: reading every cell once took {seconds * 1000:.0f}ms')
+        del int_map
@@ -0,0 +1,81 @@
+"""
+Measure the memory used by `Astar` per expanded node, with the __slots__ based
+`Node` and `State` classes and with the __dict__ based classes they replaced.
+
+Run from the assignment folder with `python -m benchmarks.memory`
+"""
+import gc
+import tracemalloc
+
+import astar.astar
+from astar.astar import Astar
+from astar.node import Node
+from astar.state import State
+from environment.generator import random_map
+
+
+class DictState:
+    """
+    The old state class, every instance has its own __dict__.
+    """
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    def __eq__(self, other) -> bool:
+        return other.x == self.x and other.y == self.y
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+
+class DictNode:
+    """
+    The old node class, every instance has its own __dict__.
+    """
+
+    def __init__(self, state: DictState):
+        self.state = state
+        self.parent = None
+        self.g = 0
+        self.h = 0
+
+    @property
+    def f(self):
+        return self.g + self.h
+
+    def __eq__(self, other) -> bool:
+        return self.state == other.state
+
+    def __hash__(self) -> int:
+        return hash(self.state)
+
+
+def bytes_per_node(map, node_class, state_class) -> 'tuple[float, int]':
+    """
+    Search the map using the given classes, returns the memory still held by the finished
+    search divided by the number of expanded nodes, and the number of expanded nodes.
+    """
+    astar.astar.Node, astar.astar.State = node_class, state_class
+    try:
+        # the adjacency index is kept by the map for every later search, so it is not counted
+        map.get_adjacency()
+        gc.collect()
+        tracemalloc.start()
+        search = Astar(map)
+        search.agenda_loop()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        astar.astar.Node, astar.astar.State = Node, State
+    return used / search.get_expanded(), search.get_expanded()
+
+
+if __name__ == "__main__":
+    map = random_map(1000, 1000, wall_ratio=0.2, max_cost=4, seed=0)
+    before, expanded = bytes_per_node(map, DictNode, DictState)
+    after, _ = bytes_per_node(map, Node, State)
+    print(f'1000x1000 map, {expanded} expanded nodes')
+    print(f'__dict__ nodes:  {before:7.1f} bytes per expanded node')
+    print(f'__slots__ nodes: {after:7.1f} bytes per expanded node ({after / before:.0%})')
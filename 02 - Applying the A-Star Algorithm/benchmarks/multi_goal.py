@@ -0,0 +1,61 @@
+"""
+Route to the nearest of N exits: compare N separate `Astar` searches, one multi-goal `Astar`
+search, and one multi-source Dijkstra pass (`distance_field`) that answers the question for
+every cell of the map at once.
+
+Run from the assignment folder with `python -m benchmarks.multi_goal`
+"""
+import time
+
+import numpy as np
+
+from astar.astar import Astar
+from astar.dijkstra import distance_field
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+
+
+def separate(map, start_pos, goals) -> 'tuple[int, int]':
+    costs, expanded = [], 0
+    for goal_pos in goals:
+        search = Astar(map, start_pos, goal_pos)
+        search.agenda_loop()
+        expanded += search.get_expanded()
+        if search.get_cost() is not None:
+            costs.append(search.get_cost())
+    return min(costs, default=None), expanded
+
+
+def multi_goal(map, start_pos, goals) -> 'tuple[int, int]':
+    search = Astar(map, start_pos, goals=goals)
+    search.agenda_loop()
+    return search.get_cost(), search.get_expanded()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    maps = [('task 4', Samfundet(task=4)), ('weighted 200x200', random_map(200, 200, wall_ratio=0.2, max_cost=3, seed=0))]
+    print(f'{"map":>17} {"exits":>6} {"separate":>21} {"multi-goal":>21} {"distance field":>15}   (10 starts)')
+    for name, map in maps:
+        rng = np.random.default_rng(0)
+        cells = np.argwhere(np.asarray(map.int_map) != -1).tolist()
+        for count in [4, 16]:
+            goals = [cells[i] for i in rng.choice(len(cells), size=count, replace=False)]
+            starts = [cells[i] for i in rng.choice(len(cells), size=10, replace=False)]
+            totals = {'separate': [0, 0.0], 'multi-goal': [0, 0.0]}
+            for start_pos in starts:
+                (cost, expanded), seconds = timed(separate, map, start_pos, goals)
+                (multi_cost, multi_expanded), multi_seconds = timed(multi_goal, map, start_pos, goals)
+                assert cost == multi_cost
+                totals['separate'][0] += expanded
+                totals['separate'][1] += seconds
+                totals['multi-goal'][0] += multi_expanded
+                totals['multi-goal'][1] += multi_seconds
+            _, field_seconds = timed(distance_field, map, goals, True)
+            columns = ' '.join(f'{expanded:>9} {seconds * 1000:>9.1f}ms' for expanded, seconds in totals.values())
+            print(f'{name:>17} {count:>6} {columns} {field_seconds * 1000:>13.1f}ms')
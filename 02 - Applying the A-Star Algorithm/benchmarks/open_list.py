@@ -0,0 +1,104 @@
+"""
+Compare the heap based open list in `Astar` with the sorted list it replaced,
+only the time spent inside the open list is reported.
+
+Run from the assignment folder with `python -m benchmarks.open_list`
+"""
+import time
+
+from astar.astar import Astar
+from astar.priority_queue import PriorityQueue
+from environment.generator import random_map
+
+
+class SortedList:
+    """
+    The old open list, a python list kept sorted by inserting nodes at their position
+    with a linear scan. Has the same interface as `PriorityQueue` so it can replace it.
+    """
+
+    def __init__(self):
+        self.entries: list = []  # [priority, key, item], cheapest first
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return any(entry[1] == key for entry in self.entries)
+
+    def get(self, key):
+        return next(entry[2] for entry in self.entries if entry[1] == key)
+
+    def push(self, key, item, priority):
+        for index, entry in enumerate(self.entries):
+            if priority < entry[0]:
+                self.entries.insert(index, [priority, key, item])
+                return
+        self.entries.append([priority, key, item])
+
+    def pop(self):
+        return self.entries.pop(0)[2]
+
+    def update(self, key, priority):
+        index = next(i for i, entry in enumerate(self.entries) if entry[1] == key)
+        item = self.entries.pop(index)[2]
+        self.push(key, item, priority)
+
+
+class TimedQueue:
+    """
+    Wraps an open list and sums up the time spent inside it, so the open list can be
+    compared on its own without the rest of the search loop.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.time = 0.0
+
+    def timed(self, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.time += time.perf_counter() - start
+        return result
+
+    def __len__(self) -> int:
+        return self.timed(self.queue.__len__)
+
+    def __contains__(self, key) -> bool:
+        return self.timed(self.queue.__contains__, key)
+
+    def get(self, key):
+        return self.timed(self.queue.get, key)
+
+    def push(self, key, item, priority):
+        return self.timed(self.queue.push, key, item, priority)
+
+    def pop(self):
+        return self.timed(self.queue.pop)
+
+    def update(self, key, priority):
+        return self.timed(self.queue.update, key, priority)
+
+
+def run(map, queue) -> 'tuple[float, int, int]':
+    """
+    Search the map with the given open list, returns the time spent in the open list,
+    the number of expanded nodes and the path cost.
+    """
+    astar = Astar(map)
+    start_node = astar.open.pop()
+    astar.open = TimedQueue(queue)
+    astar.add_to_open(start_node)
+    astar.agenda_loop()
+    return astar.open.time, len(astar.closed), astar.goal_node.g
+
+
+if __name__ == "__main__":
+    print(f'{"size":>10} {"expanded":>9} {"cost":>6} {"sorted list":>12} {"heap":>8} {"speedup":>8}')
+    for size in [100, 200, 300]:
+        map = random_map(size, size, wall_ratio=0.2, max_cost=4, seed=size)
+        list_time, list_expanded, list_cost = run(map, SortedList())
+        heap_time, heap_expanded, heap_cost = run(map, PriorityQueue())
+        assert (list_expanded, list_cost) == (heap_expanded, heap_cost)
+        print(f'{f"{size}x{size}":>10} {heap_expanded:>9} {heap_cost:>6} '
+              f'{list_time:>11.3f}s {heap_time:>7.3f}s {list_time / heap_time:>7.1f}x')
@@ -0,0 +1,46 @@
+"""
+Time building the `DistanceOracle` tables with one and with all cores, and compare answering
+random queries by table lookup with searching with `ArrayAstar`.
+
+Run from the assignment folder with `python -m benchmarks.oracle`
+"""
+import os
+import time
+
+from astar.array_astar import ArrayAstar
+from astar.batch import PathService
+from astar.oracle import DistanceOracle
+from environment.Samfundet import Samfundet
+from environment.generator import random_map
+from benchmarks.batch import random_queries
+
+
+def answer(service, queries) -> 'tuple[list, float]':
+    start = time.perf_counter()
+    results = list(service.queries(queries))
+    return results, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    maps = [(f'task {task}', Samfundet(task=task)) for task in [1, 3, 4]]
+    maps.append(('weighted 60x60', random_map(60, 60, wall_ratio=0.2, max_cost=4, seed=0)))
+    cores = os.cpu_count()
+
+    print(f'{"map":>15} {"cells":>6} {"table":>8} {"build 1":>9} {"build " + str(cores):>9} '
+          f'{"lookup":>9} {"ArrayAstar":>11}   (1000 queries)')
+    for name, map in maps:
+        start = time.perf_counter()
+        DistanceOracle(map, processes=1)
+        single = time.perf_counter() - start
+        start = time.perf_counter()
+        oracle = DistanceOracle(map)
+        parallel = time.perf_counter() - start
+
+        queries = random_queries(map, 1000)
+        lookups, lookup_seconds = answer(oracle, queries)
+        searches, search_seconds = answer(PathService(map, ArrayAstar), queries)
+        assert [cost for _, cost in lookups] == [cost for _, cost in searches]
+
+        size = (oracle.distances.nbytes + oracle.next_hops.nbytes) / 1e6
+        print(f'{name:>15} {len(oracle.cells):>6} {size:>6.1f}MB {single:>8.2f}s {parallel:>8.2f}s '
+              f'{lookup_seconds * 1000:>7.1f}ms {search_seconds * 1000:>9.1f}ms')
@@ -0,0 +1,39 @@
+"""
+Measure how the throughput of `ParallelPathService` scales with the number of worker
+processes, answering the same random queries on a generated map with 1 to N processes.
+
+Run from the assignment folder with `python -m benchmarks.parallel`
+"""
+import os
+import time
+
+from astar.batch import PathService
+from astar.parallel import ParallelPathService
+from benchmarks.batch import random_queries
+from environment.generator import random_map
+
+
+if __name__ == "__main__":
+    map = random_map(200, 200, wall_ratio=0.1, max_cost=4, seed=0)
+    queries = random_queries(map, 400)
+
+    # the workers must move the same way as the map, here diagonally
+    diagonal = random_map(60, 60, wall_ratio=0.2, max_cost=4, seed=0)
+    diagonal.set_movement(8, 'one')
+    diagonal_queries = random_queries(diagonal, 50)
+    with ParallelPathService(diagonal, 2, chunksize=8) as service:
+        assert list(service.queries(diagonal_queries)) == list(PathService(diagonal).queries(diagonal_queries))
+
+    start = time.perf_counter()
+    expected = list(PathService(map).queries(queries))
+    serial = time.perf_counter() - start
+    print(f'{"serial":>10} {len(queries) / serial:8.1f} queries/s')
+
+    for processes in range(1, (os.cpu_count() or 1) + 1):
+        with ParallelPathService(map, processes, chunksize=8) as service:
+            start = time.perf_counter()
+            results = list(service.queries(queries))
+            seconds = time.perf_counter() - start
+        assert results == expected
+        print(f'{f"{processes} cores":>10} {len(queries) / seconds:8.1f} queries/s '
+              f'({serial / seconds:.2f}x serial)')
@@ -0,0 +1,40 @@
+"""
+Show where `Astar` spends its time: profile searches on tasks 1-4 and larger generated maps,
+with the Manhattan distance and with the ALT heuristic (`Landmarks`), and compare the time of
+a search with and without the profiler. The profiles are saved as JSON in the given folder.
+
+Run from the assignment folder with `python -m benchmarks.profiler [folder]`
+"""
+import os
+import sys
+import time
+
+from astar.astar import Astar
+from astar.landmarks import Landmarks
+from astar.profiler import SearchProfiler
+from environment.Samfundet import Samfundet
+from environment.generator import maze_map, terrain_map
+
+
+def timed_search(map, profiler=None, lower_bounds=None) -> float:
+    search = Astar(map, lower_bounds=lower_bounds, profiler=profiler)
+    start = time.perf_counter()
+    search.agenda_loop()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else None
+    maps = [(f'task {task}', Samfundet(task=task)) for task in [1, 2, 3, 4]]
+    maps += [('maze 300', maze_map(300, 300, loops=0.05, max_cost=2)), ('terrain 300', terrain_map(300, 300))]
+
+    for name, map in maps:
+        for heuristic, lower_bounds in [('manhattan', None), ('landmarks', Landmarks(map))]:
+            profiler = SearchProfiler()
+            timed_search(map, profiler, lower_bounds)
+            disabled = min(timed_search(map, lower_bounds=lower_bounds) for _ in range(3))
+            enabled = min(timed_search(map, SearchProfiler(), lower_bounds) for _ in range(3))
+            print(f'{name}, {heuristic}: {disabled * 1000:.1f}ms without the profiler, {enabled * 1000:.1f}ms with it')
+            print(profiler.summary(), end='\n\n')
+            if folder is not None:
+                profiler.save(os.path.join(folder, f'{name.replace(" ", "_")}_{heuristic}.json'))
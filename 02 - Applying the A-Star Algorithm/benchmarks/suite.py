@@ -0,0 +1,166 @@
+"""
+Benchmark suite on large generated maps: mazes, halls and weighted terrain from 100x100 up to
+5000x5000. For every map and engine it records the expanded nodes, wall time, peak memory and
+path cost of the search from the top left to the bottom right corner, and writes them to a JSON
+file (and optionally a CSV file), so the results of two versions can be compared with `--compare`.
+
+Every search runs in its own forked process, which gives it a clean peak memory measurement
+(the growth of the peak resident set size) and lets a search be stopped at the time limit.
+Engines are skipped on maps larger than they can handle in reasonable time, see ENGINES.
+With `--connectivity 8` the searches may also move diagonally, and the engines that only move
+straight are skipped.
+
+Run from the assignment folder with `python -m benchmarks.suite`, for example
+`python -m benchmarks.suite --sizes 100 500 --output results.json --csv results.csv`
+"""
+import argparse
+import csv
+import datetime
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from astar.array_astar import ArrayAstar
+from astar.astar import Astar
+from astar.bidirectional import BidirectionalAstar
+from astar.hpa import HierarchicalAstar
+from astar.jps import JumpPointSearch
+from environment.adjacency import CORNERS
+from environment.generator import halls_map, maze_map, terrain_map
+
+MAPS = {
+    'maze': lambda size, seed: maze_map(size, size, loops=0.05, max_cost=2, seed=seed),
+    'halls': lambda size, seed: halls_map(size, size, max_cost=2, seed=seed),
+    'terrain': lambda size, seed: terrain_map(size, size, seed=seed),
+}
+
+# engine class and the largest map side it is run on
+ENGINES = {
+    'Astar': (Astar, 1000),
+    'ArrayAstar': (ArrayAstar, 5000),
+    'BidirectionalAstar': (BidirectionalAstar, 5000),
+    'JumpPointSearch': (JumpPointSearch, 5000),
+    'HierarchicalAstar': (HierarchicalAstar, 1000),
+}
+
+# engines that support diagonal moves
+DIAGONAL = {'Astar', 'ArrayAstar', 'BidirectionalAstar'}
+
+FIELDS = ['map', 'size', 'seed', 'connectivity', 'engine', 'status', 'cost', 'expanded', 'seconds', 'peak_memory_mb']
+
+
+def peak_memory_mb() -> float:
+    """
+    Peak resident set size of this process, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def search(map, engine: str, results):
+    """
+    Run in the child process: time one search and send its result back.
+    """
+    before = peak_memory_mb()
+    start = time.perf_counter()
+    finder = ENGINES[engine][0](map)
+    finder.agenda_loop()
+    finder.get_path()
+    seconds = time.perf_counter() - start
+    results.put({'cost': finder.get_cost(), 'expanded': finder.get_expanded(), 'seconds': round(seconds, 4),
+                 'peak_memory_mb': round(peak_memory_mb() - before, 1)})
+
+
+def run(map, engine: str, timeout: float) -> dict:
+    """
+    Run one search in a forked process, which shares the map with this one.
+    """
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=search, args=(map, engine, results))
+    process.start()
+    # the result is small enough to fit in the pipe, so the process can end before it is read
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return {'status': 'timeout'}
+    if process.exitcode != 0:
+        return {'status': 'error'}
+    return {**results.get(), 'status': 'ok'}
+
+
+def git_commit() -> 'str | None':
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(records: 'list[dict]', filename: str):
+    """
+    Print the change in time and memory since an earlier run, and any change in cost or expanded nodes.
+    """
+    with open(filename) as file:
+        previous = {(r['map'], r['size'], r.get('connectivity', 4), r['engine']): r for r in json.load(file)['results']}
+    print(f'\ncompared to {filename}')
+    for record in records:
+        old = previous.get((record['map'], record['size'], record['connectivity'], record['engine']))
+        if old is None or record['status'] != 'ok' or old['status'] != 'ok':
+            continue
+        notes = [f'{name} {old[name]} -> {record[name]}' for name in ['cost', 'expanded'] if old[name] != record[name]]
+        print(f'{record["map"]:>8} {record["size"]:>5} {record["engine"]:>18} '
+              f'time {record["seconds"] / max(old["seconds"], 1e-9):>5.2f}x '
+              f'memory {record["peak_memory_mb"] - old["peak_memory_mb"]:>+8.1f}MB  {", ".join(notes)}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument('--maps', nargs='+', choices=list(MAPS), default=list(MAPS))
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--connectivity', type=int, choices=[4, 8], default=4)
+    parser.add_argument('--corners', choices=CORNERS, default='never', help='diagonal moves past walls')
+    parser.add_argument('--timeout', type=float, default=300, help='seconds before a search is stopped')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--csv', help='also write the results to this CSV file')
+    parser.add_argument('--compare', help='results file of an earlier run to compare with')
+    args = parser.parse_args()
+
+    records = []
+    widths = {name: 18 if name == 'engine' else max(8, len(name)) for name in FIELDS}
+    print(' '.join(f'{name:>{widths[name]}}' for name in FIELDS))
+    for size in args.sizes:
+        for map_name in args.maps:
+            map = MAPS[map_name](size, args.seed)
+            map.set_movement(args.connectivity, args.corners)
+            for engine in args.engines:
+                if size > ENGINES[engine][1] or (args.connectivity == 8 and engine not in DIAGONAL):
+                    continue
+                record = {'map': map_name, 'size': size, 'seed': args.seed, 'connectivity': args.connectivity,
+                          'engine': engine,
+                          'cost': None, 'expanded': None, 'seconds': None, 'peak_memory_mb': None}
+                record.update(run(map, engine, args.timeout))
+                records.append(record)
+                print(' '.join(f'{str(record[name]):>{widths[name]}}' for name in FIELDS))
+
+    with open(args.output, 'w') as file:
+        json.dump({'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                   'commit': git_commit(), 'python': platform.python_version(), 'numpy': np.__version__,
+                   'platform': platform.platform(), 'results': records}, file, indent=1)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    if args.compare:
+        compare(records, args.compare)
@@ -1,11 +1,27 @@
 from PIL import Image
-import pandas as pd
 import time
 import numpy as np
 import os
 
+from environment.adjacency import Adjacency, CORNERS
+from environment.map_file import load_map_file
+
 np.set_printoptions(threshold=np.inf, linewidth=300)
 
+# Define what colors to give to different values of the string map when drawing it
+BACKGROUND_COLOR = (255, 238, 88)
+COLORS = {
+    ' S ': (239,	83, 	80),  # Start
+    ' G ': (129,    199,    132),  # Goal
+    ' . ': (215,    215,    215),
+    ' , ': (166,    166,    166),
+    ' : ': (96,     96,     96),
+    ' ; ': (36,     36,     36),
+    ' # ': (13,     17,     23),  # Solid wall
+}
+# Symbol of every value in the integer map, used when printing and drawing it
+SYMBOLS = {-1: ' # ', 1: ' . ', 2: ' , ', 3: ' : ', 4: ' ; '}
+
 path = os.path.dirname(__file__)
 map_1 = os.path.join(path, 'samfundet_1.csv')
 map_2 = os.path.join(path, 'samfundet_2.csv')
@@ -15,12 +31,63 @@ map_3 = os.path.join(path, 'samfundet_3.csv')
 class Samfundet:
     """
     Map over "samfundet"
+
+    Only the integer map (one byte per cell) is kept. The string map used for printing and
+    drawing is derived from it when needed, together with an overlay of the cells drawn
+    differently from their value, like the start, the goal and a path.
     """
 
     def __init__(self, task=1):
         self.task = task
         self.start_pos, self.goal_pos, self.end_goal_pos, self.path_to_map = self.fill_critical_positions()
-        self.int_map, self.str_map = self.read_map(self.path_to_map)
+        self.int_map = self.read_map(self.path_to_map)
+        self.overlay: dict[tuple[int, int], str] = {}
+        self.connectivity = 4
+        self.corners = 'never'
+        self.adjacency = None
+        self.place_markers()
+
+    @classmethod
+    def from_array(cls, int_map: np.ndarray, start_pos, goal_pos, end_goal_pos=None):
+        """
+        Create a map from an integer array instead of one of the task csv files, used for generated maps.
+        :param int_map: Integer map using the same values as the csv files (-1 for walls, 1-4 for cell costs)
+        :param start_pos: Start position
+        :param goal_pos: Initial goal position
+        :param end_goal_pos: End goal position, defaults to the goal position
+        :return: the new map
+        """
+        map = cls.__new__(cls)
+        map.task = None
+        map.start_pos = list(start_pos)
+        map.goal_pos = list(goal_pos)
+        map.end_goal_pos = list(end_goal_pos) if end_goal_pos is not None else map.goal_pos
+        map.path_to_map = None
+        map.int_map = int_map
+        map.overlay = {}
+        map.connectivity = 4
+        map.corners = 'never'
+        map.adjacency = None
+        map.place_markers()
+        return map
+
+    @classmethod
+    def from_file(cls, filename: str):
+        """
+        Create a map from a binary map file (see environment/map_file.py). The integer map is memory
+        mapped, so loading it does not depend on the size of the map, and cells are read when used.
+        :param filename: path to the .map file
+        :return: the new map
+        """
+        int_map, start_pos, goal_pos, end_goal_pos = load_map_file(filename)
+        map = cls.from_array(int_map, start_pos, goal_pos, end_goal_pos)
+        map.path_to_map = filename
+        return map
+
+    def place_markers(self):
+        """
+        Mark the start and goal positions in the string map and reset the goal movement.
+        """
         self.tmp_cell_value = self.get_cell_value(self.goal_pos)
         self.set_cell_value(self.start_pos, ' S ')
         self.set_cell_value(self.goal_pos, ' G ')
@@ -28,25 +95,42 @@ class Samfundet:
 
     def read_map(self, path):
         """
-        Reads maps specified in path from file, converts them to a numpy array and a string array. Then replaces
-        specific values in the string array with predefined values more suitable for printing.
+        Reads maps specified in path from file and converts them to a numpy array.
         :param path: Path to .csv maps
-        :return: the integer map and string map
+        :return: the integer map
         """
+        # pandas is only needed for the csv maps, binary map files are loaded without it
+        import pandas as pd
+
         # Read map from provided csv file
         df = pd.read_csv(path, index_col=None,
                          header=None)  # ,error_bad_lines=False)
-        # Convert pandas dataframe to numpy array
-        data = df.values
+        # Convert pandas dataframe to numpy array, every value fits in a single byte
+        return df.values.astype(np.int8)
+
+    @property
+    def str_map(self) -> np.ndarray:
+        """
+        The map as symbols, with the overlay on top. It is built from the integer map every time,
+        so changing the returned array does not change the map, use `set_cell_value` for that.
+        """
+        str_map = self.to_str_map(self.int_map)
+        for (x, y), value in self.overlay.items():
+            str_map[x, y] = value
+        return str_map
+
+    def to_str_map(self, data):
+        """
+        Converts an integer map to a string array with symbols more suitable for printing.
+        :param data: the integer map
+        :return: the string map
+        """
         # Convert numpy array to string to make it more human readable
-        data_str = data.astype(str)
+        data_str = data.astype('<U4')
         # Replace numeric values with more human readable symbols
-        data_str[data_str == '-1'] = ' # '
-        data_str[data_str == '1'] = ' . '
-        data_str[data_str == '2'] = ' , '
-        data_str[data_str == '3'] = ' : '
-        data_str[data_str == '4'] = ' ; '
-        return data, data_str
+        for value, symbol in SYMBOLS.items():
+            data_str[data == value] = symbol
+        return data_str
 
     def fill_critical_positions(self):
         """
@@ -95,6 +179,30 @@ class Samfundet:
     def get_end_goal_pos(self):
         return self.end_goal_pos
 
+    def get_adjacency(self) -> Adjacency:
+        """
+        Get the index over every cells passable neighbours. It is built the first time it is needed
+        and then reused by every search on this map, until a cell value in the integer map changes.
+        :return: the adjacency index
+        """
+        if self.adjacency is None:
+            self.adjacency = Adjacency(self.int_map, self.connectivity, self.corners)
+        return self.adjacency
+
+    def set_movement(self, connectivity=4, corners='never'):
+        """
+        Choose how to move between cells, used by every search on this map created afterwards.
+        Not every engine supports diagonal moves, see `Adjacency`.
+        :param connectivity: 4 to only move straight, 8 to also move diagonally
+        :param corners: if a diagonal move may pass a wall, 'never', 'one' (of the two cells beside
+            the move) or 'always'
+        """
+        if connectivity not in (4, 8) or corners not in CORNERS:
+            raise ValueError(f'unknown movement: connectivity {connectivity}, corners {corners!r}')
+        self.connectivity = connectivity
+        self.corners = corners
+        self.adjacency = None
+
     def get_maps(self):
         # Return the map in both int and string format
         return self.int_map, self.str_map
@@ -114,8 +222,15 @@ class Samfundet:
 
     def set_cell_value(self, pos: 'tuple[int, int]', value, str_map=True):
         if str_map:
-            self.str_map[pos[0], pos[1]] = value
+            # Only cells drawn differently from their value are kept in the overlay
+            cell_value = self.int_map[pos[0], pos[1]]
+            if value == SYMBOLS.get(cell_value, str(cell_value)):
+                self.overlay.pop((pos[0], pos[1]), None)
+            else:
+                self.overlay[pos[0], pos[1]] = value
         else:
+            if self.int_map[pos[0], pos[1]] != value:
+                self.adjacency = None
             self.int_map[pos[0], pos[1]] = value
 
     def print_map(self, map_to_print):
@@ -145,19 +260,10 @@ class Samfundet:
         :param goal_pos: The coordinate of the current goal
         :return: nothing.
         """
-        if value == 1:
-            str_value = ' . '
-        elif value == 2:
-            str_value = ' , '
-        elif value == 3:
-            str_value = ' : '
-        elif value == 4:
-            str_value = ' ; '
-        else:
-            str_value = str(value)
-        self.int_map[pos[0]][pos[1]] = value
-        self.str_map[pos[0]][pos[1]] = str_value
-        self.str_map[goal_pos[0], goal_pos[1]] = ' G '
+        self.set_cell_value(pos, value, str_map=False)
+        # The string map follows the integer map, unless the cell is in the overlay
+        self.overlay.pop((pos[0], pos[1]), None)
+        self.set_cell_value(goal_pos, ' G ')
 
     def tick(self):
         """
@@ -201,51 +307,41 @@ class Samfundet:
         else:
             map[goal_pos[0]][goal_pos[1]] = ' G '
 
-    def show_map(self):
+    def show_map(self, writer=None):
         """
         A function used to draw the map as an image and show it.
+        :param writer: an ImageWriter, if given the image is shown from its background threads
         """
         image = self.create_image()
-        image.show()
+        if writer is not None:
+            writer.show(image)
+        else:
+            image.show()
 
-    def save_map(self, filename):
+    def save_map(self, filename, writer=None):
         """
         A function used to draw the map as an image and saves it.
+        :param writer: an ImageWriter, if given the image is drawn right away but encoded and
+            written by its background threads
         """
         image = self.create_image()
-        image.save(filename)
+        if writer is not None:
+            writer.save(image, filename)
+        else:
+            image.save(filename)
 
     def create_image(self) -> Image:
         map = self.str_map
-        # Define width and height of image
-        height = map.shape[0]
-        width = map.shape[1]
         # Define scale of the image
         scale = 20
 
-        image = Image.new(
-            'RGB', (width * scale, height * scale), (255, 238, 88))
-        # Load image
-        pixels = image.load()
-
-        # Define what colors to give to different values of the string map,
-        # undefined values will remain yellow, this is how the yellow path is painted)
-        colors = {
-            ' S ': (239,	83, 	80),  # Start
-            ' G ': (129,    199,    132),  # Goal
-            ' . ': (215,    215,    215),
-            ' , ': (166,    166,    166),
-            ' : ': (96,     96,     96),
-            ' ; ': (36,     36,     36),
-            ' # ': (13,     17,     23),  # Solid wall
-        }
-        # Go through image and set pixel color for every position
-        for y in range(height):
-            for x in range(width):
-                if map[y][x] not in colors:
-                    continue
-                for i in range(scale):
-                    for j in range(scale):
-                        pixels[x * scale + i,
-                               y * scale + j] = colors[map[y][x]]
-        return image
+        # Look up the color of every cell, undefined values remain yellow
+        # (this is how the yellow path is painted)
+        cells = np.empty(map.shape + (3,), dtype=np.uint8)
+        cells[:] = BACKGROUND_COLOR
+        for symbol, color in COLORS.items():
+            cells[map == symbol] = color
+
+        # Scale every cell up to a block of scale x scale pixels
+        pixels = cells.repeat(scale, axis=0).repeat(scale, axis=1)
+        return Image.fromarray(pixels, 'RGB')
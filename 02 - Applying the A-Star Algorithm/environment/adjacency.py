@@ -0,0 +1,143 @@
+from functools import cached_property
+
+import numpy as np
+
+# Same order as the directions Astar used to check, changing it changes how ties are broken
+DIRECTIONS = [(0, 1), (0, -1), (-1, 0), (1, 0)]
+# Added after DIRECTIONS when moving diagonally
+DIAGONALS = [(-1, 1), (1, 1), (1, -1), (-1, -1)]
+
+# Rules for moving diagonally past a wall, which is on one of the two cells beside the move
+CORNERS = ['never', 'one', 'always']
+
+# With diagonal moves, costs are in hundredths: moving straight into a cell costs 100 times its
+# value, and moving diagonally 141 times its value (close to the square root of 2)
+STRAIGHT_COST = 100
+DIAGONAL_COST = 141
+
+
+class Adjacency:
+    """
+    Index over the passable neighbours of every cell in an integer map, stored in CSR form.
+
+    Cells are identified by their index `x * width + y`. The neighbours of cell `i` are
+    `neighbours[indptr[i]:indptr[i + 1]]`, and `costs` holds the cost of entering each of
+    those neighbours (the value of the neighbour cell). Walls (-1) and positions outside
+    the map are never neighbours. `reverse_costs` holds the cost of the opposite moves, from
+    each neighbour into cell `i`, used when searching backwards from a goal. It is only built
+    when it is first needed.
+
+    With `connectivity=8`, the diagonal neighbours are included too, and every cost is multiplied
+    by STRAIGHT_COST or DIAGONAL_COST (kept per edge in `steps`) so they stay integers. `to_cost`
+    turns such a cost back into the map's units. The `corners` rule decides if a diagonal move may
+    pass a wall: 'never' only when both cells beside it are passable, 'one' when at least one is,
+    and 'always'.
+    """
+
+    def __init__(self, int_map: np.ndarray, connectivity=4, corners='never'):
+        if connectivity not in (4, 8):
+            raise ValueError(f'connectivity must be 4 or 8, not {connectivity}')
+        if corners not in CORNERS:
+            raise ValueError(f'corners must be one of {CORNERS}, not {corners!r}')
+        height, width = int_map.shape
+        self.width = width
+        self.size = height * width
+        self.connectivity = connectivity
+        self.corners = corners
+        self.straight, self.diagonal = (1, None) if connectivity == 4 else (STRAIGHT_COST, DIAGONAL_COST)
+        directions = DIRECTIONS if connectivity == 4 else DIRECTIONS + DIAGONALS
+
+        padded = np.pad(int_map, 1, constant_values=-1)
+        index = np.arange(self.size, dtype=np.int64).reshape(height, width)
+
+        def shifted(dx, dy) -> np.ndarray:
+            return padded[1 + dx:1 + dx + height, 1 + dy:1 + dy + width].ravel()
+
+        # One column per direction, in `directions` order
+        values = np.stack([shifted(dx, dy) for dx, dy in directions], axis=1)
+        targets = np.stack([(index + dx * width + dy).ravel()
+                            for dx, dy in directions], axis=1)
+        valid = values != -1
+        for column, (dx, dy) in enumerate(directions[len(DIRECTIONS):], len(DIRECTIONS)):
+            beside = [shifted(dx, 0) != -1, shifted(0, dy) != -1]
+            if corners == 'never':
+                valid[:, column] &= beside[0] & beside[1]
+            elif corners == 'one':
+                valid[:, column] &= beside[0] | beside[1]
+
+        index_type = np.int32 if self.size < 2 ** 31 else np.int64
+        self.indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(valid.sum(axis=1), out=self.indptr[1:])
+        self.neighbours = targets[valid].astype(index_type)
+        # STRAIGHT_COST or DIAGONAL_COST for every edge, from the direction it was made for
+        self.steps = None
+        if connectivity == 4:
+            self.costs = values[valid].astype(np.int8)
+        else:
+            steps = np.array([STRAIGHT_COST] * len(DIRECTIONS) + [DIAGONAL_COST] * len(DIAGONALS), dtype=np.int16)
+            self.steps = np.broadcast_to(steps, valid.shape)[valid]
+            self.costs = values[valid] * self.steps
+        self.values = np.ascontiguousarray(int_map).ravel()
+
+        # memoryviews give fast access to the elements as plain python ints
+        self.indptr_view = memoryview(self.indptr)
+        self.neighbours_view = memoryview(self.neighbours)
+        self.costs_view = memoryview(self.costs)
+
+    @cached_property
+    def reverse_costs(self) -> np.ndarray:
+        # the move back from neighbour i enters the cell i is a neighbour of
+        sources = np.repeat(np.arange(self.size), np.diff(self.indptr))
+        if self.connectivity == 4:
+            return self.values[sources].astype(np.int8)
+        # the move back is in the opposite direction, straight or diagonal like the move itself
+        return self.values[sources] * self.steps
+
+    @cached_property
+    def reverse_costs_view(self) -> memoryview:
+        return memoryview(self.reverse_costs)
+
+    def to_index(self, pos) -> int:
+        return pos[0] * self.width + pos[1]
+
+    def to_pos(self, index: int) -> 'tuple[int, int]':
+        return divmod(index, self.width)
+
+    def to_cost(self, cost: int):
+        """
+        Convert a cost found with this index to the map's units, only needed with diagonal moves.
+        """
+        return cost if self.straight == 1 else cost / self.straight
+
+    def get_neighbours(self, index: int) -> 'list[tuple[int, int]]':
+        """
+        Get the (neighbour index, entry cost) pairs of the cell with the given index.
+        """
+        start = self.indptr_view[index]
+        end = self.indptr_view[index + 1]
+        return list(zip(self.neighbours_view[start:end], self.costs_view[start:end]))
+
+    def path_cost(self, path: 'list[tuple[int, int]]') -> int:
+        """
+        The cost of following a path in the units of this index, the start cell is free.
+        """
+        cost = 0
+        for (x, y), (next_x, next_y) in zip(path, path[1:]):
+            step = self.straight if x == next_x or y == next_y else self.diagonal
+            cost += int(self.values[next_x * self.width + next_y]) * step
+        return cost
+
+    def heuristic_field(self, goal_pos) -> np.ndarray:
+        """
+        The distance from every cell to the goal if every cell cost 1 and there were no walls,
+        in the units of this index: the Manhattan distance, or the octile distance with diagonal moves.
+        :return: flat array indexed by `x * width + y`
+        """
+        height = self.size // self.width
+        rows = np.abs(np.arange(height, dtype=np.int32) - goal_pos[0])[:, np.newaxis]
+        columns = np.abs(np.arange(self.width, dtype=np.int32) - goal_pos[1])
+        if self.connectivity == 4:
+            return (rows + columns).ravel()
+        # straight along the longer side, and diagonally for the shorter side
+        diagonal = np.minimum(rows, columns)
+        return (STRAIGHT_COST * (rows + columns) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * diagonal).ravel()
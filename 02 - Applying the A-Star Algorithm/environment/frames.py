@@ -0,0 +1,125 @@
+from typing import BinaryIO, Iterable, Iterator
+
+import numpy as np
+from PIL import Image
+
+from environment.Samfundet import Samfundet, BACKGROUND_COLOR, COLORS
+
+
+class FrameEncoder:
+    """
+    Turns a sequence of steps, each a list of (position, string value) changes to a map,
+    into an animation.
+
+    Only a single frame is drawn on. It is rendered once from the map, and after that every
+    step only repaints the cells it changes, so the cost of a step is proportional to the number
+    of changed cells instead of the size of the map. The map itself is not modified. `save_frames`
+    and `write_raw` write each frame before drawing the next one, while `save` has to keep a copy
+    of every frame, use a larger `skip` for long animations.
+
+    The frame stores an index into the palette for every pixel instead of its color, which lets
+    the animated image formats use the palette directly instead of quantizing every frame. A copy
+    with the colors is patched alongside it, for writing raw rgb frames.
+    """
+
+    def __init__(self, map: Samfundet, skip=1, scale=20):
+        """
+        :param map: the map the animation starts from
+        :param skip: only every `skip`th step becomes a frame (the last step is always included)
+        :param scale: size of a cell in pixels, must match the scale used by the map
+        """
+        self.skip = skip
+        self.scale = scale
+
+        # Same colors as Samfundet.create_image, undefined values use the background color
+        self.symbols = {symbol: index for index, symbol in enumerate(COLORS, 1)}
+        self.palette = np.array([BACKGROUND_COLOR, *COLORS.values()], dtype=np.uint8)
+
+        str_map = map.str_map  # built from the integer map on every access
+        cells = np.zeros(str_map.shape, dtype=np.uint8)
+        for symbol, index in self.symbols.items():
+            cells[str_map == symbol] = index
+        self.frame = cells.repeat(scale, axis=0).repeat(scale, axis=1)
+        self.pixels = self.palette[self.frame]
+        self.height, self.width = self.frame.shape
+
+    def set_cell(self, pos, value: str):
+        """
+        Repaint a single cell of the frame.
+        """
+        scale = self.scale
+        block = (slice(pos[0] * scale, (pos[0] + 1) * scale), slice(pos[1] * scale, (pos[1] + 1) * scale))
+        index = self.symbols.get(value, 0)
+        self.frame[block] = index
+        self.pixels[block] = self.palette[index]
+
+    def frames(self, steps: 'Iterable[list[tuple]]') -> 'Iterator[np.ndarray]':
+        """
+        Apply the steps one at a time, yielding the frame (as palette indices) after every `skip`th
+        step. The same array is yielded every time, so it must be used before asking for the next frame.
+        """
+        number = 0
+        for number, changes in enumerate(steps, 1):
+            for pos, value in changes:
+                self.set_cell(pos, value)
+            if number % self.skip == 0:
+                yield self.frame
+        if number % self.skip != 0:
+            yield self.frame
+
+    def to_image(self, frame: np.ndarray) -> Image:
+        # copy, the image would otherwise share memory with the frame buffer
+        image = Image.fromarray(frame.copy(), 'P')
+        image.putpalette(self.palette.tobytes())
+        return image
+
+    def save(self, filename: str, steps: 'Iterable[list[tuple]]', duration=200, writer=None):
+        """
+        Save the steps as an animated image, the format is given by the filename (.gif or .png
+        for an animated PNG). Every frame is copied and kept in memory until the animation is
+        written, so the memory grows with the number of frames times the size of the image:
+        use a larger `skip`, or `save_frames` or `write_raw`, for long searches on large maps.
+        :param duration: how long each frame is shown, in milliseconds
+        :param writer: an ImageWriter, if given the frames are drawn right away but the animation
+            is encoded and written by its background threads
+        """
+        # PIL keeps every frame in memory while saving either way, and reads append_images twice for PNG
+        images = [self.to_image(frame) for frame in self.frames(steps)]
+        if not images:
+            return
+        # optimize would look for unchanged pixels to make transparent in every frame, which is slow
+        params = dict(save_all=True, append_images=images[1:], duration=duration, loop=0, optimize=False)
+        if writer is not None:
+            writer.save(images[0], filename, **params)
+        else:
+            images[0].save(filename, **params)
+
+    def save_frames(self, filename: str, steps: 'Iterable[list[tuple]]', writer=None) -> int:
+        """
+        Save every frame as its own image, `filename` is formatted with the frame number,
+        for instance `'videos/task_1/{:03d}.png'`.
+        :param writer: an ImageWriter, if given the frames are encoded and written by its
+            background threads while the next frames are drawn
+        :return: the number of frames saved
+        """
+        count = 0
+        for number, frame in enumerate(self.frames(steps)):
+            image = self.to_image(frame)
+            if writer is not None:
+                writer.save(image, filename.format(number))
+            else:
+                image.save(filename.format(number))
+            count += 1
+        return count
+
+    def write_raw(self, file: BinaryIO, steps: 'Iterable[list[tuple]]') -> int:
+        """
+        Write the frames as raw rgb24 bytes, one frame after another, for instance to the stdin of
+        `ffmpeg -f rawvideo -pix_fmt rgb24 -s <width>x<height> -i - visited.mp4`.
+        :return: the number of frames written
+        """
+        count = 0
+        for _ in self.frames(steps):
+            file.write(self.pixels.tobytes())
+            count += 1
+        return count
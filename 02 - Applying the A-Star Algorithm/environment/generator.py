@@ -0,0 +1,154 @@
+import numpy as np
+
+from environment.Samfundet import Samfundet
+
+
+def random_map(height: int, width: int, wall_ratio=0.2, max_cost=1, seed=0) -> Samfundet:
+    """
+    Generate a map with randomly placed walls, surrounded by a solid wall like the task maps.
+    The start position is placed in the top left corner and the goal in the bottom right corner.
+    :param height: Number of rows in the map
+    :param width: Number of columns in the map
+    :param wall_ratio: Probability of a cell being a wall
+    :param max_cost: Cell costs are drawn uniformly from 1 to max_cost (at most 4)
+    :param seed: Seed for the random generator, the same seed always gives the same map
+    :return: the generated map
+    """
+    rng = np.random.default_rng(seed)
+    int_map = rng.integers(1, max_cost + 1, size=(height, width), dtype=np.int8)
+    int_map[rng.random((height, width)) < wall_ratio] = -1
+    int_map[[0, -1], :] = -1
+    int_map[:, [0, -1]] = -1
+
+    start_pos = [1, 1]
+    goal_pos = [height - 2, width - 2]
+    # Make sure the start and goal are not walled in
+    int_map[1:3, 1:3] = 1
+    int_map[height - 3:height - 1, width - 3:width - 1] = 1
+    return Samfundet.from_array(int_map, start_pos, goal_pos)
+
+
+def place_start_and_goal(int_map: np.ndarray, start_pos, goal_pos) -> Samfundet:
+    """
+    Clear the start and goal (and the cells around them), and create the map.
+    """
+    for x, y in [start_pos, goal_pos]:
+        around = int_map[max(x - 1, 1):x + 2, max(y - 1, 1):y + 2]
+        around[around == -1] = 1
+    int_map[[0, -1], :] = -1
+    int_map[:, [0, -1]] = -1
+    return Samfundet.from_array(int_map, start_pos, goal_pos)
+
+
+def maze_map(height: int, width: int, loops=0.0, max_cost=1, seed=0) -> Samfundet:
+    """
+    Generate a maze of corridors one cell wide, using the sidewinder algorithm: every row of the
+    maze is split into runs of random length, which are carved out and connected to the row above
+    through one random cell of the run. Without loops, there is exactly one path between two cells.
+    The start position is placed in the top left corner and the goal in the bottom right corner.
+    :param loops: Probability of removing each remaining wall between two corridors, adding loops
+    :param max_cost: Cell costs are drawn uniformly from 1 to max_cost (at most 4)
+    :param seed: Seed for the random generator, the same seed always gives the same map
+    :return: the generated map
+    """
+    rng = np.random.default_rng(seed)
+    rows, columns = (height - 1) // 2, (width - 1) // 2
+    int_map = np.full((height, width), -1, dtype=np.int8)
+    # maze cells are at odd positions, the cells between them are walls or openings
+    int_map[1:2 * rows:2, 1:2 * columns:2] = 1
+
+    # ends[i, j]: the run of maze cell j in row i ends there, the first row is a single run
+    ends = rng.random((rows, columns)) < 0.5
+    ends[0, :] = False
+    ends[:, -1] = True
+    int_map[1:2 * rows:2, 2:2 * columns - 1:2][~ends[:, :-1]] = 1
+
+    # Connect one random cell of every run (below the first row) to the row above
+    ends = ends[1:].ravel()
+    run_starts = np.concatenate([[True], ends[:-1]])
+    keys = rng.random(ends.size)
+    run_max = np.maximum.reduceat(keys, np.flatnonzero(run_starts))
+    up = (keys == run_max[np.cumsum(run_starts) - 1]).reshape(rows - 1, columns)
+    int_map[2:2 * rows - 1:2, 1:2 * columns:2][up] = 1
+
+    if loops > 0:
+        # walls between two maze cells, horizontally or vertically
+        between = np.zeros((height, width), dtype=np.bool_)
+        between[1:2 * rows:2, 2:2 * columns - 1:2] = True
+        between[2:2 * rows - 1:2, 1:2 * columns:2] = True
+        int_map[between & (int_map == -1) & (rng.random((height, width)) < loops)] = 1
+
+    if max_cost > 1:
+        open_cells = int_map != -1
+        int_map[open_cells] = rng.integers(1, max_cost + 1, size=np.count_nonzero(open_cells), dtype=np.int8)
+    return place_start_and_goal(int_map, [1, 1], [2 * rows - 1, 2 * columns - 1])
+
+
+def halls_map(height: int, width: int, room=24, door=4, max_cost=1, seed=0) -> Samfundet:
+    """
+    Generate a building of square rooms (halls) separated by walls one cell thick, with a door at a
+    random place in every wall between two rooms, so every room can be reached.
+    The start position is placed in the top left corner and the goal in the bottom right corner.
+    :param room: Distance between the walls
+    :param door: Width of the doors
+    :param max_cost: Cell costs are drawn uniformly from 1 to max_cost (at most 4)
+    :param seed: Seed for the random generator, the same seed always gives the same map
+    :return: the generated map
+    """
+    rng = np.random.default_rng(seed)
+    int_map = rng.integers(1, max_cost + 1, size=(height, width), dtype=np.int8)
+    int_map[::room, :] = -1
+    int_map[:, ::room] = -1
+
+    # every wall segment between two rooms gets a door, from the first cell after a crossing
+    for wall in range(room, height - 1, room):
+        for start in range(1, width - 1, room):
+            length = min(room - 1, width - 1 - start)
+            offset = start + rng.integers(0, max(length - door, 0) + 1)
+            int_map[wall, offset:offset + min(door, length)] = 1
+    for wall in range(room, width - 1, room):
+        for start in range(1, height - 1, room):
+            length = min(room - 1, height - 1 - start)
+            offset = start + rng.integers(0, max(length - door, 0) + 1)
+            int_map[offset:offset + min(door, length), wall] = 1
+    return place_start_and_goal(int_map, [1, 1], [height - 2, width - 2])
+
+
+def smooth_noise(rng: np.random.Generator, height: int, width: int, scale: int) -> np.ndarray:
+    """
+    Random values on a grid `scale` cells apart, linearly interpolated in between.
+    """
+    grid = rng.random((height // scale + 2, width // scale + 2), dtype=np.float32)
+    x = np.arange(height, dtype=np.float32) / scale
+    y = np.arange(width, dtype=np.float32) / scale
+    x0, y0 = x.astype(np.int64), y.astype(np.int64)
+    fx, fy = (x - x0)[:, np.newaxis], y - y0
+    # interpolate along the rows of the small grid first, then along the columns
+    rows = grid[:, y0] * (1 - fy) + grid[:, y0 + 1] * fy
+    return rows[x0] * (1 - fx) + rows[x0 + 1] * fx
+
+
+def terrain_map(height: int, width: int, wall_ratio=0.1, scale=32, seed=0) -> Samfundet:
+    """
+    Generate weighted terrain, where the cell costs (1-4) vary smoothly like the height of a
+    landscape, and the highest parts are walls. Passes are cut through the walls along every
+    `scale`-th row and column, so every pass (and the start and goal) can be reached.
+    The start position is placed in the top left corner and the goal in the bottom right corner.
+    :param wall_ratio: Share of the cells that are walls, before cutting the passes
+    :param scale: Size of the largest hills, in cells
+    :param seed: Seed for the random generator, the same seed always gives the same map
+    :return: the generated map
+    """
+    rng = np.random.default_rng(seed)
+    noise = smooth_noise(rng, height, width, scale)
+    noise += 0.5 * smooth_noise(rng, height, width, max(scale // 4, 1))
+    noise += 0.25 * smooth_noise(rng, height, width, max(scale // 16, 1))
+
+    # Thresholds from a sample of the cells, the cheapest cells are the most common
+    levels = np.quantile(noise.ravel()[::7], [0.4, 0.65, 0.85, 1 - wall_ratio])
+    int_map = (1 + np.searchsorted(levels[:3], noise)).astype(np.int8)
+    walls = noise >= levels[3]
+    walls[1::scale, :] = walls[-2, :] = False
+    walls[:, 1::scale] = walls[:, -2] = False
+    int_map[walls] = -1
+    return place_start_and_goal(int_map, [1, 1], [height - 2, width - 2])
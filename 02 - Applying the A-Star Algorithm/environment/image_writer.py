@@ -0,0 +1,83 @@
+import queue
+import threading
+
+from PIL import Image
+
+
+class ImageWriter:
+    """
+    Saves (and shows) images on background threads, so encoding and writing them overlaps
+    with whatever the caller does next, like searching or rendering the next frame.
+
+    Jobs wait in a bounded queue: when it is full, `save` blocks until a worker has taken
+    a job, which keeps a fast producer from filling up the memory with pending images.
+    PIL releases the GIL while compressing, so the threads run in parallel with the caller.
+    Use as a context manager, or call `close` when done, to wait for every image to be written.
+    """
+
+    def __init__(self, workers=2, max_pending=16):
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.errors: list[Exception] = []
+        self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                function, args, kwargs = job
+                function(*args, **kwargs)
+            except Exception as error:
+                self.errors.append(error)
+            finally:
+                self.jobs.task_done()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Run `function(*args, **kwargs)` on a worker thread, blocks while the queue is full.
+        """
+        self.jobs.put((function, args, kwargs))
+
+    def save(self, image: Image, filename: str, **params):
+        """
+        Save the image in the background, `params` are passed on to `Image.save`.
+        The image must not be changed after it is handed over.
+        """
+        self.submit(image.save, filename, **params)
+
+    def show(self, image: Image):
+        """
+        Show the image in the background.
+        """
+        self.submit(image.show)
+
+    def flush(self):
+        """
+        Wait until every submitted job is done, and raise the first error a job ran into.
+        """
+        self.jobs.join()
+        if self.errors:
+            error = self.errors[0]
+            self.errors = []
+            raise error
+
+    def close(self):
+        """
+        Wait for every submitted job and stop the worker threads.
+        """
+        try:
+            self.flush()
+        finally:
+            for _ in self.threads:
+                self.jobs.put(None)
+            for thread in self.threads:
+                thread.join()
+
+    def __enter__(self) -> 'ImageWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
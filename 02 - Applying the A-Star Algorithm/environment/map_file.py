@@ -0,0 +1,78 @@
+"""
+Compact binary map format, loaded with a memory map instead of being parsed.
+
+A map file starts with a 64 byte header, followed by the integer map as one int8 per cell
+in row-major order:
+
+    magic         4 bytes   b'SMAP'
+    version       uint16
+    header size   uint16    offset of the grid from the start of the file
+    height        uint32
+    width         uint32
+    start_pos     2 x int32
+    goal_pos      2 x int32
+    end_goal_pos  2 x int32
+
+All values are little endian. Convert the task csv files with `python -m environment.map_file`.
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b'SMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII6i')
+HEADER_SIZE = 64
+
+
+def save_map_file(filename: str, int_map: np.ndarray, start_pos, goal_pos, end_goal_pos=None):
+    """
+    Write an integer map and its positions to a map file.
+    """
+    if end_goal_pos is None:
+        end_goal_pos = goal_pos
+    height, width = int_map.shape
+    header = HEADER.pack(MAGIC, VERSION, HEADER_SIZE, height, width,
+                         *start_pos, *goal_pos, *end_goal_pos)
+    with open(filename, 'wb') as file:
+        file.write(header.ljust(HEADER_SIZE, b'\0'))
+        file.write(np.ascontiguousarray(int_map, dtype=np.int8).tobytes())
+
+
+def load_map_file(filename: str) -> 'tuple[np.ndarray, list[int], list[int], list[int]]':
+    """
+    Open a map file without reading the grid, cells are only read from disk when used.
+    The grid is mapped copy-on-write, so changing it never changes the file.
+    :return: the integer map, start position, goal position and end goal position
+    """
+    with open(filename, 'rb') as file:
+        header = file.read(HEADER.size)
+    magic, version, header_size, height, width, *positions = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f'{filename} is not a map file')
+    if version != VERSION:
+        raise ValueError(f'{filename} has unsupported map file version {version}')
+
+    int_map = np.memmap(filename, dtype=np.int8, mode='c', offset=header_size, shape=(height, width))
+    return int_map, positions[0:2], positions[2:4], positions[4:6]
+
+
+def convert_csv(csv_path: str, filename: str, start_pos, goal_pos, end_goal_pos=None):
+    """
+    Convert a csv map (like the samfundet_*.csv files) to a map file.
+    """
+    int_map = np.loadtxt(csv_path, delimiter=',', dtype=np.int8, ndmin=2)
+    save_map_file(filename, int_map, start_pos, goal_pos, end_goal_pos)
+
+
+if __name__ == "__main__":
+    import os
+    from environment.Samfundet import Samfundet
+
+    # One file per task, since the tasks using the same csv file have different positions
+    for task in [1, 2, 3, 4, 5]:
+        map = Samfundet(task=task)
+        filename = os.path.join(os.path.dirname(__file__), f'samfundet_task_{task}.map')
+        convert_csv(map.path_to_map, filename,
+                    map.get_start_pos(), map.get_goal_pos(), map.get_end_goal_pos())
+        print(f'Converted {os.path.basename(map.path_to_map)} (task {task}) to {filename}')
@@ -1,14 +1,20 @@
+import os
+
 from astar.astar import *
 from environment.Samfundet import *
+from environment.image_writer import ImageWriter
 
 if __name__ == "__main__":
     tasks = [1, 2, 3, 4]
-    for task in tasks:
-        map = Samfundet(task=task)
+    # encodes and writes the images while the next task is solved
+    with ImageWriter() as writer:
+        for task in tasks:
+            map = Samfundet(task=task)
 
-        astar = Astar(map)
-        astar.find_path()
+            astar = Astar(map)
+            astar.find_path()
 
-        astar.visualize_path(filename=f'./images/task_{task}_solved.png')
+            astar.visualize_path(filename=f'./images/task_{task}_solved.png', writer=writer)
 
-        astar.visualize_all_steps(path=f'./videos/task_{task}/')
+            os.makedirs(f'./videos/task_{task}', exist_ok=True)
+            astar.visualize_all_steps(filename=f'./videos/task_{task}/visited.gif', writer=writer)